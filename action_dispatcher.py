@@ -0,0 +1,142 @@
+"""
+Non-blocking action dispatcher
+Runs OS input injection (pyautogui calls) on a dedicated thread fed by a
+bounded queue, so recognition never waits on key presses, clicks or sleeps.
+Redundant events are coalesced and each action name can be rate limited.
+When the queue is full, pending moves are dropped before key presses, and
+half of a press/release pair is never dropped.
+"""
+
+import time
+import threading
+from collections import deque
+
+import config
+
+
+class ActionDispatcher:
+    def __init__(self, max_pending=None, rate_limits=None):
+        self.max_pending = max_pending or config.ACTION_QUEUE_SIZE
+        self.rate_limits = config.ACTION_RATE_LIMITS if rate_limits is None else rate_limits
+
+        # Pending entries are [name, func, args, coalesce, paired]; coalesced entries
+        # are also indexed by name so newer submissions replace their args
+        self.pending = deque()
+        self.coalesced = {}
+        self.last_submitted = {}
+        self.last_executed = {}
+        self.condition = threading.Condition()
+
+        # Statistics
+        self.executed = 0
+        self.coalesced_count = 0
+        self.rate_limited = 0
+        self.dropped = 0
+
+        self.running = True
+        self.thread = threading.Thread(target=self._worker, daemon=True)
+        self.thread.start()
+
+    def submit(self, name, func, *args, coalesce=False, paired=False):
+        """Queue func(*args); never blocks the caller
+
+        With coalesce=True a still-pending action of the same name is updated
+        in place, so only the latest arguments run (e.g. the latest moveTo).
+        Otherwise repeats within the action's rate limit are dropped.
+        With paired=True the action is half of a press/release pair (mouse
+        down/up) and is never dropped to bound the queue.
+        """
+        now = time.time()
+        with self.condition:
+            if coalesce:
+                entry = self.coalesced.get(name)
+                if entry is not None:
+                    entry[1] = func
+                    entry[2] = args
+                    self.coalesced_count += 1
+                    return True
+            else:
+                interval = self.rate_limits.get(name, 0)
+                if now - self.last_submitted.get(name, 0) < interval:
+                    self.rate_limited += 1
+                    return False
+
+            if len(self.pending) >= self.max_pending:
+                self._drop_one()
+
+            entry = [name, func, args, coalesce, paired]
+            self.pending.append(entry)
+            if coalesce:
+                self.coalesced[name] = entry
+            self.last_submitted[name] = now
+            self.condition.notify()
+            return True
+
+    def _drop_one(self):
+        """Keep the queue bounded: drop the oldest coalesced move, else the
+        oldest unpaired action; paired actions are kept even over the bound"""
+        victim = next((entry for entry in self.pending if entry[3]), None)
+        if victim is None:
+            victim = next((entry for entry in self.pending if not entry[4]), None)
+            if victim is None:
+                return
+        self.pending.remove(victim)
+        if victim[3]:
+            del self.coalesced[victim[0]]
+        self.dropped += 1
+
+    def _worker(self):
+        while True:
+            with self.condition:
+                while self.running and not self.pending:
+                    self.condition.wait()
+                if not self.running:
+                    return
+
+                name, func, args, coalesce, paired = self.pending[0]
+
+                # Coalesced actions wait out their rate limit while newer
+                # submissions keep replacing the pending arguments
+                if coalesce:
+                    interval = self.rate_limits.get(name, 0)
+                    remaining = self.last_executed.get(name, 0) + interval - time.time()
+                    if remaining > 0:
+                        self.condition.wait(remaining)
+                        continue
+                    del self.coalesced[name]
+
+                entry = self.pending.popleft()
+                func, args = entry[1], entry[2]
+
+            try:
+                func(*args)
+            except Exception as e:
+                print(f"Error executing action {name}: {e}")
+
+            with self.condition:
+                self.last_executed[name] = time.time()
+                self.executed += 1
+
+    def pending_count(self):
+        with self.condition:
+            return len(self.pending)
+
+    def get_stats(self):
+        with self.condition:
+            return {
+                'executed': self.executed,
+                'coalesced': self.coalesced_count,
+                'rate_limited': self.rate_limited,
+                'dropped': self.dropped,
+                'pending': len(self.pending)
+            }
+
+    def stop(self, timeout=1.0):
+        """Stop the worker after giving pending actions a short time to finish"""
+        deadline = time.time() + timeout
+        while self.pending_count() and time.time() < deadline:
+            time.sleep(0.01)
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        self.thread.join(timeout=timeout)
@@ -0,0 +1,201 @@
+"""
+Gesture combos
+Matches sequences of confirmed gestures (e.g. fist -> open_palm -> two_fingers)
+against the combos in config.GESTURE_COMBOS. The combos are compiled once
+into an Aho-Corasick automaton with a precomputed transition table, so each
+gesture event is a single table lookup no matter how many combos exist.
+Each combo also limits the time allowed between consecutive gestures.
+
+Gestures that start or extend a combo usually have actions of their own
+(fist stops playback), so the controllers hold those actions back: hold()
+defers the action of a gesture that is part of a live combo prefix, and
+release() hands it back once that prefix breaks off or times out. Gestures
+that complete a combo are consumed and their actions never run.
+"""
+
+import time
+from collections import deque
+
+import config
+
+
+class ComboMatcher:
+    def __init__(self, combos=None, timeout=None):
+        combos = config.GESTURE_COMBOS if combos is None else combos
+        self.timeout = timeout or config.GESTURE_COMBO_TIMEOUT
+
+        self.combos = []
+        for name, spec in combos.items():
+            sequence = list(spec['sequence'])
+            if len(sequence) < 2:
+                raise ValueError(f"Combo '{name}' needs at least two gestures")
+            self.combos.append({
+                'name': name,
+                'label': spec.get('name', name),
+                'sequence': sequence,
+                'max_gap': min(spec.get('max_gap', self.timeout), self.timeout),
+                'keys': list(spec.get('keys', []))
+            })
+        self._compile()
+
+        self.state = 0
+        self.last_time = None
+        # Gaps between the most recent events, enough for the longest combo
+        longest = max((len(c['sequence']) for c in self.combos), default=1)
+        self.gaps = deque(maxlen=longest)
+        # Most recent (event number, gesture) pairs and the held actions
+        self.recent = deque(maxlen=longest)
+        self.held = []
+        self.consumed = (0, 0)   # event numbers (first, last] of the last completed combo
+
+        # Statistics
+        self.events = 0
+        self.matches = 0
+        self.timeouts = 0
+        self.released = 0
+
+    def _compile(self):
+        """Build the trie, failure links and the full transition table"""
+        alphabet = sorted({g for combo in self.combos for g in combo['sequence']})
+        self.symbols = {gesture: i for i, gesture in enumerate(alphabet)}
+
+        # Trie: goto[node] maps symbol -> child, output[node] lists combo indices,
+        # depth[node] is the prefix length and max_gap[node] the longest wait
+        # any combo through the node allows before its next gesture
+        goto = [{}]
+        output = [[]]
+        self.depth = [0]
+        self.max_gap = [0.0]
+        for index, combo in enumerate(self.combos):
+            node = 0
+            for gesture in combo['sequence']:
+                self.max_gap[node] = max(self.max_gap[node], combo['max_gap'])
+                symbol = self.symbols[gesture]
+                if symbol not in goto[node]:
+                    goto.append({})
+                    output.append([])
+                    self.depth.append(self.depth[node] + 1)
+                    self.max_gap.append(0.0)
+                    goto[node][symbol] = len(goto) - 1
+                node = goto[node][symbol]
+            output[node].append(index)
+
+        # Breadth-first: failure links, inherited outputs and the dense table
+        fail = [0] * len(goto)
+        self.table = [[0] * len(alphabet) for _ in goto]
+        queue = deque()
+        for symbol in range(len(alphabet)):
+            child = goto[0].get(symbol, 0)
+            self.table[0][symbol] = child
+            if child:
+                queue.append(child)
+        while queue:
+            node = queue.popleft()
+            output[node] += output[fail[node]]
+            for symbol in range(len(alphabet)):
+                child = goto[node].get(symbol)
+                if child is None:
+                    self.table[node][symbol] = self.table[fail[node]][symbol]
+                else:
+                    fail[child] = self.table[fail[node]][symbol]
+                    self.table[node][symbol] = child
+                    queue.append(child)
+
+        # Longest combo first, so "a b c" wins over its suffix "b c"
+        self.output = [sorted(matches, key=lambda i: -len(self.combos[i]['sequence']))
+                       for matches in output]
+
+        # Longest suffix of each state that some combo can still extend
+        self.fail = fail
+        self.prefix = [0] * len(goto)
+        for node in sorted(range(1, len(goto)), key=lambda n: self.depth[n]):
+            self.prefix[node] = node if goto[node] else self.prefix[fail[node]]
+
+    def reset(self):
+        self.state = 0
+        self.last_time = None
+        self.gaps.clear()
+        self.recent.clear()
+        self.held.clear()
+
+    def feed(self, gesture, timestamp=None):
+        """Advance on a confirmed gesture; return the completed combo (dict) or None"""
+        timestamp = time.time() if timestamp is None else timestamp
+        self.events += 1
+
+        # Continue from the longest suffix whose combos still allow the wait
+        # since the previous gesture, or start over if there is none
+        if self.last_time is not None:
+            gap = timestamp - self.last_time
+            live = self._live_node(timestamp)
+            if self.prefix[self.state] and not live:
+                self.timeouts += 1
+            self.state = live
+            if gap > self.timeout:
+                self.gaps.clear()
+            else:
+                self.gaps.append(gap)
+        self.last_time = timestamp
+
+        symbol = self.symbols.get(gesture)
+        self.state = 0 if symbol is None else self.table[self.state][symbol]
+        self.recent.append((self.events, gesture))
+
+        for index in self.output[self.state]:
+            combo = self.combos[index]
+            steps = len(combo['sequence']) - 1
+            # The last `steps` gaps separate exactly this combo's gestures
+            if len(self.gaps) >= steps and \
+                    all(self.gaps[-k] <= combo['max_gap'] for k in range(1, steps + 1)):
+                self.matches += 1
+                self.state = 0
+                self.gaps.clear()
+                self.consumed = (self.events - steps - 1, self.events)
+                return combo
+        return None
+
+    def _live_node(self, timestamp):
+        """Longest suffix of the state that a combo can still extend in time"""
+        node = self.prefix[self.state]
+        if self.last_time is not None:
+            gap = timestamp - self.last_time
+            while node and gap > self.max_gap[node]:
+                node = self.prefix[self.fail[node]]
+        return node
+
+    def hold(self, gesture, timestamp=None):
+        """Whether the action of a fed gesture must not run now: it is held while
+        the gesture is part of a live combo prefix and dropped if it completed one"""
+        timestamp = time.time() if timestamp is None else timestamp
+        for event, fed in reversed(self.recent):
+            if fed != gesture:
+                continue
+            if self.consumed[0] < event <= self.consumed[1]:
+                return True
+            if event > self.events - self.depth[self._live_node(timestamp)]:
+                self.held.append((event, gesture))
+                return True
+            return False
+        return False
+
+    def release(self, timestamp=None):
+        """Return the held gestures whose combo prefix broke off or timed out, oldest first"""
+        if not self.held:
+            return []
+        timestamp = time.time() if timestamp is None else timestamp
+        live_after = self.events - self.depth[self._live_node(timestamp)]
+        released = [gesture for event, gesture in self.held
+                    if event <= live_after and not self.consumed[0] < event <= self.consumed[1]]
+        self.held = [(event, gesture) for event, gesture in self.held if event > live_after]
+        self.released += len(released)
+        return released
+
+    def get_stats(self):
+        return {
+            'combos': len(self.combos),
+            'states': len(self.table),
+            'events': self.events,
+            'matches': self.matches,
+            'timeouts': self.timeouts,
+            'released': self.released
+        }
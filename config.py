@@ -5,21 +5,152 @@ CAMERA_INDEX = 0  # Try 1, 2 if camera not detected
 CAMERA_WIDTH = 1280
 CAMERA_HEIGHT = 720
 CAMERA_FPS = 30
+CAPTURE_THREADED = True   # Read the camera on a background thread
+CAPTURE_BUFFER_SIZE = 2   # Frames kept by the capture thread (only the newest is used)
+IDLE_MODE_ENABLED = True  # Drop to low-power capture when no hand has been seen for a while
+IDLE_TIMEOUT = 10.0       # Seconds without a hand before entering idle mode
+IDLE_CAMERA_WIDTH = 320   # Capture resolution and frame rate while idle
+IDLE_CAMERA_HEIGHT = 240
+IDLE_CAMERA_FPS = 5
+IDLE_SETTLE_FRAMES = 5    # Frames after a switch in which motion is ignored (capture size changes)
 
 # MediaPipe Settings
-MEDIAPIPE_MODEL_COMPLEXITY = 1  # 0, 1, or 2 (higher = more accurate but slower)
+MEDIAPIPE_MODEL_COMPLEXITY = 0  # 0 or 1 (higher = more accurate but slower); 0 is stable with landmark smoothing
 MEDIAPIPE_MIN_DETECTION_CONFIDENCE = 0.7
 MEDIAPIPE_MIN_TRACKING_CONFIDENCE = 0.5
-MEDIAPIPE_MAX_NUM_HANDS = 1
+MEDIAPIPE_MAX_NUM_HANDS = 2
+# Off by default: video-mode Hands already tracks the hand region and skips palm
+# detection, so a crop (static mode, palm detection on every call) costs more
+# than a full frame (~26 ms vs ~10 ms per call with a hand at complexity 0)
+ROI_TRACKING_ENABLED = False  # Run MediaPipe on a crop around the last hand position
+ROI_PADDING = 0.25           # Extra margin around the hand box (fraction of its size per side)
+ROI_INPUT_SIZE = 256         # Side length (pixels) the ROI crop is resized to
+ROI_REDETECT_INTERVAL = 10   # Search the full frame for more hands every N ROI frames
+INFERENCE_SKIP_ENABLED = True          # Extrapolate landmarks instead of inferring every frame
+INFERENCE_SKIP_MAX_FRAMES = 3          # Run inference at least every N frames
+INFERENCE_SKIP_MOTION_THRESHOLD = 0.04 # Re-infer early once predicted motion exceeds this (normalized)
+INFERENCE_SKIP_FAST_SPEED = 1.0        # Wrist speed (frame widths/s) at which every frame is inferred
+MOTION_GATE_ENABLED = True             # Skip inference while the scene is static and no hand is tracked
+MOTION_GATE_SIZE = (64, 48)            # Resolution (width, height) the frame difference is computed at
+MOTION_GATE_PIXEL_THRESHOLD = 20       # Gray-level difference from the background that counts as change
+MOTION_GATE_MIN_CHANGED = 0.01         # Fraction of changed pixels that wakes inference
+MOTION_GATE_BACKGROUND_RATE = 0.05     # Running background update weight per frame
+MOTION_GATE_MAX_SKIP = 30              # Infer at least every N frames even in a static scene
+
+# Skin Detection Settings (no-MediaPipe versions)
+SKIN_SEGMENT_SCALE = 0.5  # Segment a downscaled frame (1.0 = full resolution)
+SKIN_MODEL_ADAPTIVE = True           # Learn a hue/saturation histogram instead of the fixed HSV range
+SKIN_MODEL_FILE = None               # Calibration histogram saved by demo.py and loaded if present
+                                     # (None = ~/.cache/hand_gesture_controller/skin_model.npy)
+SKIN_HIST_BINS = (30, 32)            # Hue and saturation bins
+SKIN_HIST_DECAY = 0.05               # Share of each new hand sample in the histogram
+SKIN_HIST_MIN_PIXELS = 200           # Smaller samples are not learned from
+SKIN_LEARN_MIN_FINGERS = 2           # Learn only from contours with this many separated fingers
+SKIN_BACKPROJECT_THRESHOLD = 40      # Back-projection value (0-255) counted as skin
+SKIN_MIN_SATURATION = 20             # Pixels below these never count as skin
+SKIN_MIN_VALUE = 40
+FINGER_DEFECT_DEPTH_RATIO = 0.2  # Convexity defect depth (fraction of sqrt(hand area)) between two fingers
+FINGER_DEFECT_MAX_ANGLE = 90     # Widest angle (degrees) between two fingers at a defect
+FINGER_EXTENSION_RATIO = 0.9     # Hull reach from the centroid (fraction of sqrt(hand area)) of a raised finger
+
+# Multi-Hand Settings
+HAND_TRACK_MAX_DISTANCE = 0.25   # Furthest a wrist may move between frames and keep its track (normalized)
+HAND_TRACK_TIMEOUT = 1.0         # Seconds a lost hand keeps its track id and state
+HANDEDNESS_SWAPPED = True        # Frames are not mirrored, so MediaPipe's Left/Right labels are swapped
+HAND_ROLES = {                   # Role of each hand when several are visible ('cursor', 'commands' or 'all')
+    'Right': 'cursor',
+    'Left': 'commands'
+}
+
+# Landmark Smoothing Settings
+LANDMARK_FILTER = 'one_euro'            # 'one_euro', 'kalman' or 'none'
+LANDMARK_ONE_EURO_MIN_CUTOFF = 1.5      # Hz, lower = steadier landmarks when the hand is still
+LANDMARK_ONE_EURO_BETA = 5.0            # Cutoff increase per frame-width/s of landmark speed
+LANDMARK_ONE_EURO_D_CUTOFF = 1.0        # Hz, smoothing of the speed estimate
+LANDMARK_KALMAN_PROCESS_NOISE = 2.0     # Acceleration variance (normalized units/s^2)^2
+LANDMARK_KALMAN_MEASUREMENT_NOISE = 2.5e-5  # Landmark position noise variance (normalized units^2)
 
 # Gesture Recognition Settings
 FINGER_EXTENSION_THRESHOLD = 1.2  # Multiplier for finger extension detection
 PINCH_DISTANCE_THRESHOLD = 0.05   # Distance threshold for pinch gesture
+PINCH_RELEASE_THRESHOLD = 0.08    # Thumb-index distance that ends a pinch drag (hysteresis)
 GESTURE_COOLDOWN_TIME = 1.0       # Seconds between gesture actions
+GESTURE_CONFIRM_VOTES = 6         # Frames out of GESTURE_HISTORY_SIZE a new gesture needs to be confirmed
+GESTURE_MIN_DWELL_TIME = 0.05     # Seconds a gesture must keep its majority before its action fires
+
+# Motion Gesture Settings
+MOTION_GESTURES_ENABLED = True  # Recognize swipes, circles and push/pull from the hand trajectory
+MOTION_WINDOW = 30              # Frames of trajectory kept
+MOTION_SWIPE_TIME = 0.4         # Seconds a swipe may take
+MOTION_SWIPE_DISTANCE = 0.25    # Minimum wrist travel for a swipe (fraction of the frame)
+MOTION_SWIPE_AXIS_RATIO = 2.0   # Travel along the swipe axis vs. across it
+MOTION_CIRCLE_TURNS = 0.9       # Fraction of a full turn the fingertip path must make
+MOTION_CIRCLE_MIN_SIZE = 0.08   # Minimum circle width/height (fraction of the frame)
+MOTION_PUSH_SCALE_RATIO = 1.3   # Hand size change for push (toward the camera) / pull
+MOTION_COOLDOWN = 0.6           # Seconds after a motion gesture before the next one
+MOTION_MIRROR_X = True          # Camera faces the user: swipe_left is the user's left
+
+# Gesture Combo Settings
+# Sequences of confirmed gestures (static or motion) that run a macro: the
+# keys are pressed in order. max_gap is the most time allowed between two
+# gestures of the combo (capped by GESTURE_COMBO_TIMEOUT).
+GESTURE_COMBOS_ENABLED = True
+GESTURE_COMBO_TIMEOUT = 2.0     # Seconds without a gesture before a partial combo is dropped
+GESTURE_COMBOS = {
+    'next_track': {
+        'name': 'Next Track',
+        'sequence': ['fist', 'open_palm', 'two_fingers'],
+        'max_gap': 1.5,
+        'keys': ['nexttrack']
+    },
+    'previous_track': {
+        'name': 'Previous Track',
+        'sequence': ['fist', 'open_palm', 'thumbs_up'],
+        'max_gap': 1.5,
+        'keys': ['prevtrack']
+    },
+    'page_top': {
+        'name': 'Top',
+        'sequence': ['open_palm', 'swipe_up'],
+        'max_gap': 1.0,
+        'keys': ['home']
+    },
+    'page_bottom': {
+        'name': 'Bottom',
+        'sequence': ['open_palm', 'swipe_down'],
+        'max_gap': 1.0,
+        'keys': ['end']
+    }
+}
 
 # Mouse Control Settings
-MOUSE_SMOOTHING_FACTOR = 0.7      # Smoothing for mouse movement (0.0-1.0)
+MOUSE_SMOOTHING_FACTOR = 0.7      # Weight of the newest position for the 'exponential' filter (0.0-1.0)
 MOUSE_SENSITIVITY = 2.0           # Mouse movement sensitivity
+CURSOR_FILTER = 'one_euro'        # 'one_euro', 'exponential' or 'none'
+ONE_EURO_MIN_CUTOFF = 1.0         # Hz, lower = smoother when the hand is still
+ONE_EURO_BETA = 0.007             # Cutoff increase per pixel/s of speed, higher = less lag
+ONE_EURO_D_CUTOFF = 1.0           # Hz, smoothing of the speed estimate
+CURSOR_PREDICTION_ENABLED = True  # Extrapolate along the cursor velocity to hide latency
+CURSOR_PREDICTION_LATENCY = None  # Seconds to predict ahead, None = measured capture-to-output latency
+CURSOR_PREDICTION_MAX_LATENCY = 0.1  # Upper bound on how far ahead the cursor is predicted
+
+# Input Backend Settings
+INPUT_BACKEND = 'auto'        # 'auto', 'pyautogui', 'xtest' (Linux/X11) or 'recording'
+INPUT_PYAUTOGUI_PAUSE = 0.0   # pyautogui.PAUSE (library default is 0.1 s after every call)
+INPUT_FAILSAFE = True         # Abort when the cursor hits a screen corner (pyautogui only)
+
+# Action Dispatch Settings
+ACTION_QUEUE_SIZE = 16            # Pending input events before one is dropped (moves first, never drag press/release)
+ACTION_RATE_LIMITS = {            # Minimum seconds between two events of the same action
+    'move_mouse': 0.0,
+    'stop': 0.5,
+    'confirm': 0.5,
+    'play': 0.5,
+    'volume_up': 0.2,
+    'volume_down': 0.2,
+    'drag_press': 0.0,            # Never rate limit drag press/release, or the button could stick
+    'drag_release': 0.0
+}
 
 # Robot Arm Settings (Full Version)
 ROBOT_ARM_WIDTH = 800
@@ -30,48 +161,108 @@ ROBOT_ARM_FPS = 30
 # Text-to-Speech Settings (Full Version)
 TTS_RATE = 150  # Speech rate (words per minute)
 TTS_VOLUME = 0.8  # Volume level (0.0-1.0)
+TTS_QUEUE_SIZE = 3  # Pending announcements kept (only the latest is spoken)
+TTS_MAX_AGE = 1.5   # Seconds after which a pending announcement is dropped
+TTS_CLIP_CACHE_ENABLED = True  # Render phrases to audio once and replay them through pygame
+TTS_CACHE_DIR = None           # None = ~/.cache/hand_gesture_controller/speech
+TTS_PRERENDER_PHRASES = ['Stop', 'Confirm', 'Play', 'Volume Up', 'Volume Down', 'Drag',
+                         'Previous', 'Next', 'Page Up', 'Page Down', 'Mute', 'Select', 'Back',
+                         'Next Track', 'Previous Track', 'Top', 'Bottom']
 
 # Gesture Mappings
+# 'fingers' lists the extended fingers of a static pose (0=thumb ... 4=pinky);
+# 'pinch' gestures are checked when no pose matches; 'motion' gestures come
+# from motion_gestures.py and press the key in KEYBOARD_ACTIONS
 GESTURE_ACTIONS = {
     'open_palm': {
         'name': 'Idle',
         'description': 'All 5 fingers extended',
-        'action': 'idle'
+        'action': 'idle',
+        'fingers': [0, 1, 2, 3, 4]
     },
     'fist': {
         'name': 'Stop',
         'description': 'All fingers closed',
-        'action': 'stop'
+        'action': 'stop',
+        'fingers': []
     },
     'thumbs_up': {
         'name': 'Confirm',
         'description': 'Only thumb extended',
-        'action': 'confirm'
+        'action': 'confirm',
+        'fingers': [0]
     },
     'two_fingers': {
         'name': 'Play',
         'description': 'Index and middle finger',
-        'action': 'play'
+        'action': 'play',
+        'fingers': [1, 2]
     },
     'three_fingers': {
         'name': 'Volume Up',
         'description': 'Index, middle, ring finger',
-        'action': 'volume_up'
+        'action': 'volume_up',
+        'fingers': [1, 2, 3]
     },
     'four_fingers': {
         'name': 'Volume Down',
         'description': 'All except thumb',
-        'action': 'volume_down'
+        'action': 'volume_down',
+        'fingers': [1, 2, 3, 4]
     },
     'point': {
         'name': 'Move Mouse',
         'description': 'Only index finger',
-        'action': 'move_mouse'
+        'action': 'move_mouse',
+        'fingers': [1]
     },
     'pinch': {
         'name': 'Drag',
         'description': 'Thumb and index close',
-        'action': 'drag'
+        'action': 'drag',
+        'pinch': True
+    },
+    'swipe_left': {
+        'name': 'Previous',
+        'description': 'Quick swipe to the left',
+        'action': 'previous',
+        'motion': True
+    },
+    'swipe_right': {
+        'name': 'Next',
+        'description': 'Quick swipe to the right',
+        'action': 'next',
+        'motion': True
+    },
+    'swipe_up': {
+        'name': 'Page Up',
+        'description': 'Quick swipe up',
+        'action': 'page_up',
+        'motion': True
+    },
+    'swipe_down': {
+        'name': 'Page Down',
+        'description': 'Quick swipe down',
+        'action': 'page_down',
+        'motion': True
+    },
+    'circle': {
+        'name': 'Mute',
+        'description': 'Index fingertip draws a circle',
+        'action': 'mute',
+        'motion': True
+    },
+    'push': {
+        'name': 'Select',
+        'description': 'Hand moves toward the camera',
+        'action': 'select',
+        'motion': True
+    },
+    'pull': {
+        'name': 'Back',
+        'description': 'Hand moves away from the camera',
+        'action': 'back',
+        'motion': True
     }
 }
 
@@ -81,7 +272,14 @@ KEYBOARD_ACTIONS = {
     'confirm': 'enter',
     'play': 'space',
     'volume_up': 'volumeup',
-    'volume_down': 'volumedown'
+    'volume_down': 'volumedown',
+    'previous': 'left',
+    'next': 'right',
+    'page_up': 'pageup',
+    'page_down': 'pagedown',
+    'mute': 'volumemute',
+    'select': 'enter',
+    'back': 'esc'
 }
 
 # Visual Settings
@@ -92,11 +290,31 @@ ACTION_INFO_COLOR = (255, 0, 0)    # Red
 
 # Performance Settings
 ENABLE_SMOOTHING = True
-ENABLE_GESTURE_HISTORY = True
-GESTURE_HISTORY_SIZE = 10
+ENABLE_GESTURE_HISTORY = True  # Debounce gestures with a rolling majority vote
+GESTURE_HISTORY_SIZE = 10      # Frames in the gesture vote window
 ENABLE_VOICE_FEEDBACK = True  # Full version only
 ENABLE_ROBOT_ARM = True       # Full version only
 
+# Pipeline Settings (Full Version)
+PIPELINE_ENABLED = True   # Run capture, inference and recognition on separate threads
+PIPELINE_QUEUE_SIZE = 2   # Maximum results waiting between inference, recognition and display
+
+# Latency Governor Settings (MediaPipe versions)
+QOS_ENABLED = True
+QOS_LATENCY_TARGET = 0.050   # Seconds, capture-to-display latency to stay under
+QOS_PERCENTILE = 95          # Latency percentile held under the target
+QOS_WINDOW = 60              # Frames measured before each decision
+QOS_UPGRADE_MARGIN = 0.7     # Quality is raised only below target * margin
+QOS_UPGRADE_HOLD = 5.0       # Seconds at a level before quality may be raised again
+QOS_LEVELS = [               # Cheaper settings level by level (overrides of the configured defaults)
+    {},
+    {'draw_overlays': False},
+    {'draw_overlays': False, 'model_complexity': 0},
+    {'draw_overlays': False, 'model_complexity': 0, 'inference_scale': 0.75},
+    {'draw_overlays': False, 'model_complexity': 0, 'inference_scale': 0.5},
+    {'draw_overlays': False, 'model_complexity': 0, 'inference_scale': 0.5, 'max_skip': 6}
+]
+
 # Debug Settings
 DEBUG_MODE = False
 LOG_GESTURES = False
@@ -0,0 +1,91 @@
+"""
+Hand contour analysis
+Picks the largest skin contour and measures it in one pass: area, bounding
+box, centroid, convex hull and convexity defects are each computed once.
+Fingers are counted from the defects (deep, narrow valleys between
+fingertips), so the count does not depend on the distance to the camera.
+"""
+
+import math
+import cv2
+import numpy as np
+
+import config
+
+# Gesture for each finger count (0-5)
+FINGER_COUNT_GESTURES = ('fist', 'point', 'two_fingers', 'three_fingers', 'four_fingers', 'open_palm')
+
+
+def analyze_hand_contour(contours, min_area=0):
+    """Measure the largest contour; return a dict, or None if there is no hand
+
+    Keys: contour, area, bbox (x, y, w, h), center (bounding box center),
+    centroid, hull (points), gaps (far points between fingers) and fingers.
+    """
+    if not contours:
+        return None
+
+    # Area of every contour exactly once
+    areas = [cv2.contourArea(contour) for contour in contours]
+    best = int(np.argmax(areas))
+    area = areas[best]
+    if area < max(min_area, 1):
+        return None
+    contour = contours[best]
+
+    x, y, w, h = cv2.boundingRect(contour)
+    moments = cv2.moments(contour)
+    centroid = (moments['m10'] / moments['m00'], moments['m01'] / moments['m00'])
+
+    # Hull as indices (needed for the defects) and as points
+    hull_indices = cv2.convexHull(contour, returnPoints=False)
+    hull = contour[hull_indices[:, 0]]
+    try:
+        defects = cv2.convexityDefects(contour, hull_indices) if len(hull_indices) > 3 else None
+    except cv2.error:
+        # Self-intersecting contours can give non-monotonic hull indices
+        defects = None
+
+    gaps = _finger_gaps(contour, defects, math.sqrt(area))
+    if len(gaps):
+        fingers = min(len(gaps) + 1, 5)
+    else:
+        # No valley: a single finger stands out from the hull, a fist does not
+        reach = np.hypot(hull[:, 0, 0] - centroid[0], hull[:, 0, 1] - centroid[1]).max()
+        fingers = 1 if reach > config.FINGER_EXTENSION_RATIO * math.sqrt(area) else 0
+
+    return {
+        'contour': contour,
+        'area': area,
+        'bbox': (x, y, w, h),
+        'center': (x + w // 2, y + h // 2),
+        'centroid': centroid,
+        'hull': hull,
+        'gaps': gaps,
+        'fingers': fingers
+    }
+
+
+def _finger_gaps(contour, defects, size):
+    """Far points of the defects that separate two fingers, as an (N, 2) array"""
+    if defects is None:
+        return np.empty((0, 2), dtype=np.int32)
+    defects = defects.reshape(-1, 4)  # (N, 1, 4) or (N, 4) depending on the OpenCV version
+    points = contour[:, 0].astype(np.float64)
+    start = points[defects[:, 0]]
+    end = points[defects[:, 1]]
+    far = points[defects[:, 2]]
+    depth = defects[:, 3] / 256.0
+
+    # Deep enough relative to the hand, and narrow enough to be between fingers
+    a = start - far
+    b = end - far
+    cosine = (a * b).sum(axis=1) / np.maximum(np.hypot(*a.T) * np.hypot(*b.T), 1e-9)
+    valid = (depth > config.FINGER_DEFECT_DEPTH_RATIO * size) & \
+            (cosine > math.cos(math.radians(config.FINGER_DEFECT_MAX_ANGLE)))
+    return far[valid].astype(np.int32)
+
+
+def gesture_from_fingers(fingers):
+    """Gesture name for a finger count"""
+    return FINGER_COUNT_GESTURES[min(max(fingers, 0), len(FINGER_COUNT_GESTURES) - 1)]
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Cursor filters
+Pluggable smoothing for the mouse cursor: the original exponential blend, a
+One-Euro filter (smooth when still, responsive when moving fast) and optional
+constant-velocity prediction that compensates for the measured latency
+between frame capture and cursor output. Run this file to benchmark jitter
+and lag on recorded trajectories.
+"""
+
+import math
+import time
+import argparse
+import numpy as np
+
+import config
+
+
+def smoothing_alpha(cutoff, dt):
+    """Exponential smoothing factor for a first-order low-pass at the given cutoff (Hz)"""
+    tau = 1.0 / (2 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class PassthroughFilter:
+    def filter(self, position, timestamp=None):
+        return position
+
+    def reset(self):
+        pass
+
+
+class ExponentialFilter:
+    """Fixed blend of the new position with the previous output"""
+
+    def __init__(self, smoothing=None):
+        self.weight = config.MOUSE_SMOOTHING_FACTOR if smoothing is None else smoothing
+        self.last = None
+
+    def filter(self, position, timestamp=None):
+        if self.last is not None:
+            position = (self.weight * position[0] + (1 - self.weight) * self.last[0],
+                        self.weight * position[1] + (1 - self.weight) * self.last[1])
+        self.last = position
+        return position
+
+    def reset(self):
+        self.last = None
+
+
+class OneEuroFilter:
+    """One-Euro filter: the cutoff frequency rises with speed"""
+
+    def __init__(self, min_cutoff=None, beta=None, d_cutoff=None):
+        self.min_cutoff = min_cutoff or config.ONE_EURO_MIN_CUTOFF
+        self.beta = config.ONE_EURO_BETA if beta is None else beta
+        self.d_cutoff = d_cutoff or config.ONE_EURO_D_CUTOFF
+        self.reset()
+
+    def reset(self):
+        self.x = None          # filtered position
+        self.dx = np.zeros(2)  # filtered velocity (units per second)
+        self.last_time = None
+
+    def filter(self, position, timestamp=None):
+        timestamp = time.time() if timestamp is None else timestamp
+        position = np.asarray(position, dtype=np.float64)
+
+        if self.x is None:
+            self.x = position
+            self.last_time = timestamp
+            return tuple(self.x)
+
+        dt = timestamp - self.last_time
+        if dt <= 0:
+            return tuple(self.x)
+        self.last_time = timestamp
+
+        # Filtered derivative drives the adaptive cutoff
+        velocity = (position - self.x) / dt
+        self.dx = self.dx + smoothing_alpha(self.d_cutoff, dt) * (velocity - self.dx)
+        cutoff = self.min_cutoff + self.beta * np.linalg.norm(self.dx)
+        self.x = self.x + smoothing_alpha(cutoff, dt) * (position - self.x)
+        return tuple(self.x)
+
+
+class PredictiveFilter:
+    """Extrapolates a One-Euro output along its velocity to cancel pipeline latency"""
+
+    def __init__(self, base_filter, latency=None, max_latency=None):
+        self.base_filter = base_filter
+        # None means: measure the latency from the capture timestamps
+        self.latency = latency
+        self.max_latency = max_latency or config.CURSOR_PREDICTION_MAX_LATENCY
+        self.measured_latency = 0.0
+
+    def filter(self, position, timestamp=None):
+        now = time.time()
+        timestamp = now if timestamp is None else timestamp
+        x, y = self.base_filter.filter(position, timestamp)
+
+        if self.latency is None:
+            # Timestamps are frame capture times, so now - timestamp is the latency
+            self.measured_latency = 0.9 * self.measured_latency + 0.1 * (now - timestamp)
+            latency = self.measured_latency
+        else:
+            latency = self.latency
+        latency = min(max(latency, 0.0), self.max_latency)
+
+        dx, dy = self.base_filter.dx
+        return x + dx * latency, y + dy * latency
+
+    def reset(self):
+        self.base_filter.reset()
+
+
+def create_cursor_filter(name=None):
+    """Create the cursor filter configured in config.py"""
+    name = name or config.CURSOR_FILTER
+    if name == 'none':
+        return PassthroughFilter()
+    if name == 'exponential':
+        return ExponentialFilter()
+
+    cursor_filter = OneEuroFilter()
+    if config.CURSOR_PREDICTION_ENABLED:
+        return PredictiveFilter(cursor_filter, config.CURSOR_PREDICTION_LATENCY)
+    return cursor_filter
+
+
+def measure_jitter_and_lag(output, reference, dt, max_lag_frames=15):
+    """Return (jitter, lag)
+
+    jitter is the RMS second difference of the output (pixels per frame^2),
+    lag is the signed time shift (seconds) that best aligns the output with
+    the reference trajectory: positive when the output trails the
+    reference, negative when it leads (overshoots).
+    """
+    jitter = float(np.sqrt((np.diff(output, n=2, axis=0) ** 2).sum(axis=1).mean()))
+
+    shifts = np.arange(-max_lag_frames, max_lag_frames + 1)
+    errors = []
+    for shift in shifts:
+        if shift >= 0:
+            aligned_output, aligned_reference = output[shift:], reference[:len(reference) - shift]
+        else:
+            aligned_output, aligned_reference = output[:len(output) + shift], reference[-shift:]
+        errors.append(np.linalg.norm(aligned_output - aligned_reference, axis=1).mean())
+    best = int(np.argmin(errors))
+
+    # Parabolic interpolation around the best shift (including 0) for sub-frame resolution
+    offset = 0.0
+    if 0 < best < len(shifts) - 1:
+        left, center, right = errors[best - 1], errors[best], errors[best + 1]
+        denominator = left - 2 * center + right
+        if denominator > 0:
+            offset = 0.5 * (left - right) / denominator
+    return jitter, (shifts[best] + offset) * dt
+
+
+def benchmark_filters(trajectory, timestamps, filters):
+    """Run each filter over a trajectory and report jitter and lag
+
+    trajectory is a (T, 2) array of raw cursor positions. The reference is a
+    centered (non-causal) moving average, which has no lag of its own.
+    """
+    dt = float(np.median(np.diff(timestamps)))
+    kernel = np.ones(5) / 5
+    reference = np.stack([np.convolve(trajectory[:, i], kernel, mode='same') for i in range(2)], axis=1)
+    reference[:2] = trajectory[:2]
+    reference[-2:] = trajectory[-2:]
+
+    results = {}
+    for name, cursor_filter in filters.items():
+        output = np.array([cursor_filter.filter(tuple(p), t) for p, t in zip(trajectory, timestamps)])
+        results[name] = measure_jitter_and_lag(output, reference, dt)
+    return results
+
+
+def synthetic_trajectory(seconds=10.0, fps=30.0, noise=3.0, seed=0):
+    """Hand-like trajectory: holds still, then sweeps, with detection noise (pixels)"""
+    rng = np.random.default_rng(seed)
+    timestamps = np.arange(0, seconds, 1.0 / fps)
+    phase = np.clip(np.sin(timestamps * 0.8) * 2, -1, 1)
+    path = np.stack([960 + 600 * phase, 540 + 300 * np.sin(timestamps * 0.5)], axis=1)
+    return path + rng.normal(0, noise, path.shape), timestamps
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark cursor filters on recorded trajectories")
+    parser.add_argument('recordings', nargs='*',
+                        help=".npy files with (T, 3) [time, x, y] or (T, 2) [x, y] rows")
+    parser.add_argument('--fps', type=float, default=30.0, help="frame rate for (T, 2) recordings")
+    args = parser.parse_args()
+
+    recordings = []
+    for path in args.recordings:
+        data = np.load(path)
+        if data.shape[1] == 3:
+            recordings.append((path, data[:, 1:], data[:, 0]))
+        else:
+            recordings.append((path, data, np.arange(len(data)) / args.fps))
+    if not recordings:
+        trajectory, timestamps = synthetic_trajectory(fps=args.fps)
+        recordings.append(('synthetic', trajectory, timestamps))
+
+    for name, trajectory, timestamps in recordings:
+        filters = {
+            'none': PassthroughFilter(),
+            'exponential': ExponentialFilter(),
+            'one_euro': OneEuroFilter(),
+            # Timestamps are replayed, so prediction uses a fixed one-frame latency
+            'one_euro + prediction': PredictiveFilter(OneEuroFilter(), 1.0 / args.fps)
+        }
+        print(f"{name}:")
+        for filter_name, (jitter, lag) in benchmark_filters(trajectory, timestamps, filters).items():
+            print(f"  {filter_name:<24} jitter {jitter:6.2f} px  lag {lag * 1000:+5.0f} ms")
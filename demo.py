@@ -9,10 +9,14 @@ import mediapipe as mp
 import numpy as np
 import time
 from simple_gesture_controller import SimpleHandGestureController
+from skin_segmenter import AdaptiveSkinSegmenter
+
+# Palm landmarks (wrist, thumb base, finger bases) enclose solid skin
+PALM_LANDMARKS = [0, 1, 5, 9, 13, 17]
 
 class GestureDemo:
-    def __init__(self):
-        self.controller = SimpleHandGestureController()
+    def __init__(self, frame_source=None):
+        self.controller = SimpleHandGestureController(frame_source=frame_source)
         self.demo_mode = True
         self.gesture_count = {}
         self.start_time = time.time()
@@ -30,9 +34,11 @@ class GestureDemo:
         
         try:
             while True:
-                ret, frame = self.controller.cap.read()
+                # Same capture path as the controller: idle throttling and frame time
+                ret, frame, frame_time = self.controller.read_frame()
                 if not ret:
                     break
+                self.controller.frame_time = frame_time
                 
                 # Process frame
                 frame, gesture, hand_pos = self.controller.process_frame(frame)
@@ -164,6 +170,7 @@ def run_calibration():
     print("📷 Camera Calibration")
     print("Position your hand in the camera view and make different gestures.")
     print("This will help ensure optimal detection.")
+    print("Skin colors sampled from your palm are saved for the no-MediaPipe controllers.")
     
     cap = cv2.VideoCapture(0)
     cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
@@ -178,6 +185,11 @@ def run_calibration():
     )
     mp_drawing = mp.solutions.drawing_utils
     
+    # Palm samples seed the adaptive skin model (a running mean over the calibration)
+    skin_model = AdaptiveSkinSegmenter(np.array([0, 20, 70], dtype=np.uint8),
+                                       np.array([20, 255, 255], dtype=np.uint8))
+    skin_samples = 0
+    
     start_time = time.time()
     detection_count = 0
     
@@ -193,7 +205,14 @@ def run_calibration():
             
             if results.multi_hand_landmarks:
                 detection_count += 1
+                height, width = frame.shape[:2]
                 for hand_landmarks in results.multi_hand_landmarks:
+                    # Sample skin colors before anything is drawn on the frame
+                    palm = np.array([(hand_landmarks.landmark[i].x * width, hand_landmarks.landmark[i].y * height)
+                                     for i in PALM_LANDMARKS], dtype=np.int32)
+                    skin_model.learn(cv2.convexHull(palm), frame, weight=1.0 / (skin_samples + 1))
+                    skin_samples = skin_model.updates
+                    
                     mp_drawing.draw_landmarks(
                         frame,
                         hand_landmarks,
@@ -211,6 +230,8 @@ def run_calibration():
                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
             cv2.putText(frame, f"Detections: {detection_count}", (10, 100), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+            cv2.putText(frame, f"Skin samples: {skin_samples}", (10, 130), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
             
             cv2.imshow('Camera Calibration', frame)
             
@@ -225,6 +246,8 @@ def run_calibration():
         print(f"Calibration complete!")
         print(f"Runtime: {runtime:.1f} seconds")
         print(f"Hand detections: {detection_count}")
+        if skin_samples > 0:
+            skin_model.save()
         if detection_count > 0:
             print("✅ Camera is working well!")
         else:
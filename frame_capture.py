@@ -0,0 +1,144 @@
+"""
+Threaded frame capture
+Reads the camera on a background thread so the processing loop always
+gets the newest frame instead of one that has been waiting in the driver queue
+"""
+
+import cv2
+import time
+import threading
+from collections import deque
+
+import config
+
+
+class ThreadedFrameCapture:
+    def __init__(self, camera_index=0, width=None, height=None, fps=None,
+                 buffer_size=None, threaded=None):
+        # Open camera
+        self.cap = cv2.VideoCapture(camera_index)
+        if width:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        if height:
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        if fps:
+            self.cap.set(cv2.CAP_PROP_FPS, fps)
+
+        # Ring buffer of (frame, timestamp, frame_id), newest on the right
+        self.buffer = deque(maxlen=buffer_size or config.CAPTURE_BUFFER_SIZE)
+        self.lock = threading.Lock()
+        self.new_frame = threading.Condition(self.lock)
+        self.cap_lock = threading.Lock()
+
+        # Statistics
+        self.frames_captured = 0
+        self.frames_delivered = 0
+        self.dropped_frames = 0
+        self.last_delivered_id = 0
+
+        self.threaded = config.CAPTURE_THREADED if threaded is None else threaded
+        self.running = False
+        self.thread = None
+        if self.threaded and self.cap.isOpened():
+            self.start()
+
+    def start(self):
+        """Start the capture thread"""
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self.thread.start()
+
+    def _capture_loop(self):
+        """Read frames as fast as the camera delivers them"""
+        while self.running:
+            with self.cap_lock:
+                ret, frame = self.cap.read()
+            timestamp = time.time()
+            if not ret:
+                with self.new_frame:
+                    self.running = False
+                    self.new_frame.notify_all()
+                break
+
+            with self.new_frame:
+                self.frames_captured += 1
+                self.buffer.append((frame, timestamp, self.frames_captured))
+                self.new_frame.notify_all()
+
+    def read_latest(self, timeout=None):
+        """Return (ret, frame, timestamp) for the newest frame not yet delivered"""
+        if not self.threaded:
+            with self.cap_lock:
+                ret, frame = self.cap.read()
+            if ret:
+                self.frames_captured += 1
+                self.frames_delivered += 1
+            return ret, frame, time.time()
+
+        with self.new_frame:
+            # Wait until the capture thread has something new or stops
+            if not self.new_frame.wait_for(self._has_new_frame, timeout):
+                return False, None, None
+            if not self.buffer or self.buffer[-1][2] == self.last_delivered_id:
+                return False, None, None
+
+            frame, timestamp, frame_id = self.buffer[-1]
+
+            # Every frame captured since the last delivery is skipped
+            self.dropped_frames += frame_id - self.last_delivered_id - 1
+            self.last_delivered_id = frame_id
+            self.frames_delivered += 1
+            self.buffer.clear()
+
+        return True, frame, timestamp
+
+    def _has_new_frame(self):
+        return not self.running or (bool(self.buffer) and
+                                    self.buffer[-1][2] != self.last_delivered_id)
+
+    def read(self):
+        """Drop-in replacement for cv2.VideoCapture.read"""
+        ret, frame, _ = self.read_latest()
+        return ret, frame
+
+    def get_stats(self):
+        """Return capture statistics"""
+        with self.lock:
+            return {
+                'captured': self.frames_captured,
+                'delivered': self.frames_delivered,
+                'dropped': self.dropped_frames
+            }
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def set(self, prop, value):
+        with self.cap_lock:
+            return self.cap.set(prop, value)
+
+    def get(self, prop):
+        with self.cap_lock:
+            return self.cap.get(prop)
+
+    def release(self):
+        """Stop the capture thread and release the camera"""
+        with self.new_frame:
+            self.running = False
+            self.new_frame.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+        self.cap.release()
+
+
+def open_camera(camera_index=None, width=None, height=None, fps=None):
+    """Open the configured camera with the capture settings from config.py"""
+    return ThreadedFrameCapture(
+        config.CAMERA_INDEX if camera_index is None else camera_index,
+        width or config.CAMERA_WIDTH,
+        height or config.CAMERA_HEIGHT,
+        fps or config.CAMERA_FPS
+    )
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Frame sources for headless runs
+Feed a controller from a video file, an image directory, a .npy stack or a
+synthetic generator instead of the webcam, and benchmark process_frame
+"""
+
+import cv2
+import numpy as np
+import os
+import time
+import argparse
+
+import config
+
+
+class FrameSource:
+    """Base class with the same read interface as ThreadedFrameCapture"""
+
+    def __init__(self, fps=30.0, realtime=False, loop=False):
+        self.fps = fps or 30.0
+        self.realtime = realtime
+        self.loop = loop
+        self.start_time = None  # wall-clock time of the first frame, where the source timeline starts
+        self.frames_delivered = 0
+        self.opened = True
+
+    def next_frame(self):
+        """Return the next frame or None when the source is exhausted"""
+        raise NotImplementedError
+
+    def rewind(self):
+        """Restart the source from the first frame"""
+        raise NotImplementedError
+
+    def read_latest(self, timeout=None):
+        """Return (ret, frame, timestamp), paced to the source FPS in real-time mode
+
+        The timestamp is the frame's time on the source timeline (index / fps
+        after the first frame), so timing-dependent stages see the same frame
+        intervals in fast and real-time runs.
+        """
+        if not self.opened:
+            return False, None, None
+
+        frame = self.next_frame()
+        if frame is None and self.loop and self.frames_delivered > 0:
+            self.rewind()
+            frame = self.next_frame()
+        if frame is None:
+            return False, None, None
+
+        if self.start_time is None:
+            self.start_time = time.time()
+        timestamp = self.start_time + self.frames_delivered / self.fps
+        if self.realtime:
+            # Wait until this frame's slot on the source timeline
+            delay = timestamp - time.time()
+            if delay > 0:
+                time.sleep(delay)
+
+        self.frames_delivered += 1
+        return True, frame, timestamp
+
+    def read(self):
+        ret, frame, _ = self.read_latest()
+        return ret, frame
+
+    def get_stats(self):
+        return {
+            'captured': self.frames_delivered,
+            'delivered': self.frames_delivered,
+            'dropped': 0
+        }
+
+    def isOpened(self):
+        return self.opened
+
+    def set(self, prop, value):
+        return False
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        return 0
+
+    def release(self):
+        self.opened = False
+
+
+class VideoFileSource(FrameSource):
+    def __init__(self, path, realtime=False, loop=False):
+        self.cap = cv2.VideoCapture(path)
+        super().__init__(self.cap.get(cv2.CAP_PROP_FPS), realtime, loop)
+        self.opened = self.cap.isOpened()
+
+    def next_frame(self):
+        ret, frame = self.cap.read()
+        return frame if ret else None
+
+    def rewind(self):
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def release(self):
+        super().release()
+        self.cap.release()
+
+
+class ImageDirectorySource(FrameSource):
+    IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+    def __init__(self, path, fps=30.0, realtime=False, loop=False):
+        super().__init__(fps, realtime, loop)
+        self.paths = sorted(
+            os.path.join(path, name) for name in os.listdir(path)
+            if name.lower().endswith(self.IMAGE_EXTENSIONS)
+        )
+        self.index = 0
+        self.opened = bool(self.paths)
+
+    def next_frame(self):
+        while self.index < len(self.paths):
+            frame = cv2.imread(self.paths[self.index])
+            self.index += 1
+            if frame is not None:
+                return frame
+        return None
+
+    def rewind(self):
+        self.index = 0
+
+
+class NumpyStackSource(FrameSource):
+    def __init__(self, stack, fps=30.0, realtime=False, loop=False):
+        super().__init__(fps, realtime, loop)
+        # Memory-map file stacks so large recordings are not loaded up front
+        if isinstance(stack, str):
+            stack = np.load(stack, mmap_mode='r')
+        if stack.ndim != 4:
+            raise ValueError(f"Expected an (N, H, W, 3) stack, got shape {stack.shape}")
+        self.stack = stack
+        self.index = 0
+        self.opened = len(stack) > 0
+
+    def next_frame(self):
+        if self.index >= len(self.stack):
+            return None
+        frame = np.ascontiguousarray(self.stack[self.index], dtype=np.uint8)
+        self.index += 1
+        return frame
+
+    def rewind(self):
+        self.index = 0
+
+
+class SyntheticSource(FrameSource):
+    """Moving skin-colored blob on a dark background"""
+
+    def __init__(self, width=1280, height=720, num_frames=300, fps=30.0,
+                 realtime=False, loop=False, seed=0):
+        super().__init__(fps, realtime, loop)
+        self.width = width
+        self.height = height
+        self.num_frames = num_frames
+        self.index = 0
+
+        # Noise background is generated once so the source never limits throughput
+        rng = np.random.default_rng(seed)
+        self.background = rng.integers(0, 30, (height, width, 3), dtype=np.uint8)
+
+    def next_frame(self):
+        if self.num_frames is not None and self.index >= self.num_frames:
+            return None
+
+        frame = self.background.copy()
+
+        # Blob follows a slow Lissajous path and changes size like an opening hand
+        t = self.index / self.fps
+        center = (int(self.width * (0.5 + 0.3 * np.sin(t))),
+                  int(self.height * (0.5 + 0.3 * np.sin(2 * t))))
+        radius = int(min(self.width, self.height) * (0.08 + 0.04 * np.sin(0.5 * t)))
+        cv2.circle(frame, center, radius, (120, 150, 200), -1)
+
+        self.index += 1
+        return frame
+
+    def rewind(self):
+        self.index = 0
+
+
+def open_frame_source(spec, realtime=False, loop=False, fps=30.0):
+    """Open a frame source from a path or the word 'synthetic'"""
+    if spec == 'synthetic':
+        return SyntheticSource(fps=fps, realtime=realtime, loop=loop)
+    if os.path.isdir(spec):
+        return ImageDirectorySource(spec, fps, realtime, loop)
+    if spec.endswith('.npy'):
+        return NumpyStackSource(spec, fps, realtime, loop)
+    return VideoFileSource(spec, realtime, loop)
+
+
+def run_headless(controller, max_frames=None):
+    """Run controller.process_frame over its frame source and report throughput"""
+    frame_times = []
+    gesture_count = {}
+    start_time = time.time()
+
+    while max_frames is None or len(frame_times) < max_frames:
+        ret, frame, frame_time = controller.cap.read_latest()
+        if not ret:
+            break
+        controller.frame_time = frame_time
+
+        frame_start = time.perf_counter()
+        frame, gesture, hand_pos = controller.process_frame(frame)
+        frame_times.append(time.perf_counter() - frame_start)
+
+        if gesture:
+            gesture_count[gesture] = gesture_count.get(gesture, 0) + 1
+
+    elapsed = time.time() - start_time
+    frame_times = np.array(frame_times) * 1000
+    return {
+        'frames': len(frame_times),
+        'fps': len(frame_times) / elapsed if elapsed > 0 else 0,
+        'mean_ms': float(frame_times.mean()) if len(frame_times) else 0,
+        'p95_ms': float(np.percentile(frame_times, 95)) if len(frame_times) else 0,
+        'gestures': gesture_count
+    }
+
+
+def create_controller(name, frame_source):
+    """Create one of the controllers with the given frame source
+
+    Benchmarks must not move the real mouse or speak, so while the controller
+    is created actions go to the in-memory recording backend and voice
+    feedback is off; the settings are restored afterwards.
+    """
+    saved = config.INPUT_BACKEND, config.ENABLE_VOICE_FEEDBACK
+    config.INPUT_BACKEND = 'recording'
+    config.ENABLE_VOICE_FEEDBACK = False
+    try:
+        if name == 'full':
+            from hand_gesture_controller import HandGestureController
+            return HandGestureController(frame_source=frame_source)
+        if name == 'simple':
+            from simple_gesture_controller import SimpleHandGestureController
+            return SimpleHandGestureController(frame_source=frame_source)
+        if name == 'no_mediapipe':
+            from simple_gesture_controller_no_mediapipe import SimpleHandGestureController
+            return SimpleHandGestureController(frame_source=frame_source)
+        from working_gesture_controller import WorkingHandGestureController
+        return WorkingHandGestureController(frame_source=frame_source)
+    finally:
+        config.INPUT_BACKEND, config.ENABLE_VOICE_FEEDBACK = saved
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark gesture recognition without a webcam")
+    parser.add_argument('source', help="video file, image directory, .npy stack or 'synthetic'")
+    parser.add_argument('--controller', default='working',
+                        choices=['full', 'simple', 'no_mediapipe', 'working'])
+    parser.add_argument('--realtime', action='store_true', help="pace frames to the source FPS")
+    parser.add_argument('--max-frames', type=int, default=None)
+    args = parser.parse_args()
+
+    source = open_frame_source(args.source, realtime=args.realtime)
+    if not source.isOpened():
+        print(f"❌ Could not open frame source: {args.source}")
+        raise SystemExit(1)
+
+    controller = create_controller(args.controller, source)
+    try:
+        stats = run_headless(controller, args.max_frames)
+    finally:
+        controller.cleanup()
+
+    print(f"Frames: {stats['frames']}")
+    print(f"Throughput: {stats['fps']:.1f} FPS")
+    print(f"process_frame: mean {stats['mean_ms']:.2f} ms, p95 {stats['p95_ms']:.2f} ms")
+    for gesture, count in sorted(stats['gestures'].items(), key=lambda x: x[1], reverse=True):
+        print(f"  {gesture}: {count}")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Gesture classification
+Encodes the five finger-extension states as a 5-bit mask and resolves the
+gesture through a 32-entry table generated from config.GESTURE_ACTIONS, with
+pinch as a secondary check. Works on single hands and on (N, 21, 3) batches.
+"""
+
+import numpy as np
+import time
+import argparse
+
+import config
+from landmarks import finger_extension_mask, pinch_distance
+
+# Bit value of each finger in the extension mask (thumb, index, middle, ring, pinky)
+FINGER_BITS = np.array([1, 2, 4, 8, 16], dtype=np.uint8)
+
+
+class GestureClassifier:
+    def __init__(self, gesture_actions=None):
+        gesture_actions = config.GESTURE_ACTIONS if gesture_actions is None else gesture_actions
+
+        # Integer code per gesture; code 0 means no gesture
+        self.labels = [None]
+        self.table = [None] * 32
+        self.pinch_gesture = None
+
+        for name, spec in gesture_actions.items():
+            fingers = spec.get('fingers')
+            if fingers is not None:
+                mask = 0
+                for finger in fingers:
+                    mask |= 1 << finger
+                # First declaration wins when two gestures share a pose
+                if self.table[mask] is None:
+                    self.table[mask] = name
+                    self.labels.append(name)
+            elif spec.get('pinch') and self.pinch_gesture is None:
+                self.pinch_gesture = name
+                self.labels.append(name)
+
+        # Same tables as integer codes for batch classification
+        self.label_array = np.array(self.labels, dtype=object)
+        self.code_table = np.array(
+            [self.labels.index(name) for name in self.table], dtype=np.int8
+        )
+        self.pinch_code = self.labels.index(self.pinch_gesture) if self.pinch_gesture else 0
+
+    def classify(self, landmarks):
+        """Classify a single (21, 3) landmark array"""
+        mask = int(finger_extension_mask(landmarks) @ FINGER_BITS)
+        gesture = self.table[mask]
+
+        # Check for pinch gesture (thumb and index finger close)
+        if gesture is None and self.pinch_gesture is not None:
+            if pinch_distance(landmarks) < config.PINCH_DISTANCE_THRESHOLD:
+                gesture = self.pinch_gesture
+
+        return gesture
+
+    def classify_batch(self, landmarks, chunk_size=65536):
+        """Classify an (N, 21, 3) landmark array
+
+        Returns (labels, extended) where labels is an (N,) object array of gesture
+        names (None when nothing matches) and extended is the (N, 5) bool
+        finger-extension mask (thumb, index, middle, ring, pinky).
+        """
+        landmarks = np.asarray(landmarks)
+        if landmarks.ndim != 3 or landmarks.shape[1:] != (21, 3):
+            raise ValueError(f"Expected an (N, 21, 3) landmark array, got shape {landmarks.shape}")
+
+        count = len(landmarks)
+        codes = np.empty(count, dtype=np.int8)
+        extended = np.empty((count, 5), dtype=bool)
+
+        # Chunks keep the float64 temporaries small for very large recordings
+        for start in range(0, count, chunk_size):
+            chunk = landmarks[start:start + chunk_size]
+            chunk_extended = finger_extension_mask(chunk)
+            chunk_codes = self.code_table[chunk_extended @ FINGER_BITS]
+
+            if self.pinch_code:
+                pinched = (chunk_codes == 0) & \
+                    (pinch_distance(chunk) < config.PINCH_DISTANCE_THRESHOLD)
+                chunk_codes[pinched] = self.pinch_code
+
+            extended[start:start + chunk_size] = chunk_extended
+            codes[start:start + chunk_size] = chunk_codes
+
+        return self.label_array[codes], extended
+
+
+_default_classifier = None
+
+
+def recognize_gestures_batch(landmarks, chunk_size=65536):
+    """Classify an (N, 21, 3) landmark array with the gestures from config.py"""
+    global _default_classifier
+    if _default_classifier is None:
+        _default_classifier = GestureClassifier()
+    return _default_classifier.classify_batch(landmarks, chunk_size)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-label recorded landmark frames")
+    parser.add_argument('landmarks', help=".npy file with an (N, 21, 3) landmark array")
+    parser.add_argument('--output', help="save labels to this .npy file")
+    args = parser.parse_args()
+
+    data = np.load(args.landmarks, mmap_mode='r')
+    start_time = time.time()
+    labels, extended = recognize_gestures_batch(data)
+    elapsed = time.time() - start_time
+
+    print(f"Labeled {len(labels)} frames in {elapsed:.2f} seconds")
+    names, counts = np.unique(labels.astype(str), return_counts=True)
+    for name, count in sorted(zip(names, counts), key=lambda x: x[1], reverse=True):
+        print(f"  {name}: {count}")
+
+    if args.output:
+        np.save(args.output, labels.astype(str))
+        print(f"Labels saved to {args.output}")
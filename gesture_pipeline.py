@@ -0,0 +1,193 @@
+"""
+Staged gesture pipeline
+Runs capture, MediaPipe inference and gesture recognition/dispatch on their
+own threads with bounded queues in between, so throughput approaches the
+slowest stage instead of the sum of all stages. Capture hands inference only
+its newest frame: a frame still waiting when the next one arrives is dropped
+rather than queued, so inference never works on stale frames.
+"""
+
+import cv2
+import time
+import queue
+import threading
+
+import config
+
+# Marks the end of the stream as it travels down the pipeline
+END_OF_STREAM = object()
+
+
+class PipelineStage:
+    def __init__(self, name, func, input_queue, output_queue, latest_only=False):
+        self.name = name
+        self.func = func
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.latest_only = latest_only  # replace a waiting item instead of blocking
+
+        # Statistics
+        self.processed = 0
+        self.dropped = 0
+        self.avg_time = 0.0  # exponential moving average in seconds
+        self.last_time = 0.0
+
+        self.stop_event = None
+        self.thread = None
+
+    def start(self, stop_event):
+        self.stop_event = stop_event
+        self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self.thread.start()
+
+    def _put(self, item):
+        """Put with backpressure, giving up once the pipeline is stopping"""
+        if self.latest_only:
+            self._replace(item)
+            return
+        while not self.stop_event.is_set():
+            try:
+                self.output_queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _replace(self, item):
+        """Put without blocking, dropping the stale items still waiting"""
+        while True:
+            try:
+                self.output_queue.put_nowait(item)
+                return
+            except queue.Full:
+                pass
+            try:
+                self.output_queue.get_nowait()
+                self.dropped += 1
+            except queue.Empty:
+                pass
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            if self.input_queue is None:
+                item = None
+            else:
+                try:
+                    item = self.input_queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is END_OF_STREAM:
+                    self._put(END_OF_STREAM)
+                    return
+
+            start = time.perf_counter()
+            try:
+                result = self.func(item)
+            except Exception as e:
+                print(f"Error in {self.name} stage: {e}")
+                result = END_OF_STREAM
+            self.last_time = time.perf_counter() - start
+            self.avg_time = self.last_time if self.processed == 0 else \
+                0.9 * self.avg_time + 0.1 * self.last_time
+            self.processed += 1
+
+            if result is None:
+                continue
+            self._put(result)
+            if result is END_OF_STREAM:
+                return
+
+
+class GesturePipeline:
+    def __init__(self, controller, queue_size=None):
+        self.controller = controller
+        queue_size = queue_size or config.PIPELINE_QUEUE_SIZE
+
+        # capture -> inference -> recognition -> display (main thread);
+        # only the newest captured frame waits for inference
+        self.inference_queue = queue.Queue(maxsize=1)
+        self.recognition_queue = queue.Queue(maxsize=queue_size)
+        self.display_queue = queue.Queue(maxsize=queue_size)
+
+        self.stages = [
+            PipelineStage('capture', self._capture, None, self.inference_queue, latest_only=True),
+            PipelineStage('inference', self._inference, self.inference_queue, self.recognition_queue),
+            PipelineStage('recognition', self._recognition, self.recognition_queue, self.display_queue)
+        ]
+        self.queues = {
+            'inference': self.inference_queue,
+            'recognition': self.recognition_queue,
+            'display': self.display_queue
+        }
+        self.stop_event = threading.Event()
+
+        # Display statistics (measured on the main thread)
+        self.display_avg_time = 0.0
+        self.frames_displayed = 0
+
+    def _capture(self, _):
+        ret, frame, frame_time = self.controller.read_frame()
+        if not ret:
+            return END_OF_STREAM
+        return {'frame': frame, 'frame_time': frame_time}
+
+    def _inference(self, item):
+        item['results'] = self.controller.detect_hands(item['frame'])
+        return item
+
+    def _recognition(self, item):
+        self.controller.frame_time = item['frame_time']
+        frame, gesture, hand_pos = self.controller.analyze_results(item['frame'], item['results'])
+        self.controller.handle_gestures()
+        item['frame'] = frame
+        item['gesture'] = gesture
+        return item
+
+    def start(self):
+        for stage in self.stages:
+            stage.start(self.stop_event)
+
+    def stop(self):
+        self.stop_event.set()
+        for stage in self.stages:
+            stage.thread.join(timeout=1.0)
+
+    def get(self, timeout=0.1):
+        """Return the next finished frame, None if nothing is ready, or END_OF_STREAM"""
+        try:
+            return self.display_queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def record_display_time(self, seconds):
+        self.display_avg_time = seconds if self.frames_displayed == 0 else \
+            0.9 * self.display_avg_time + 0.1 * seconds
+        self.frames_displayed += 1
+
+    def get_stats(self):
+        """Return per-stage average time (ms), dropped frames and queue depths"""
+        stats = {
+            stage.name: {'avg_ms': stage.avg_time * 1000, 'processed': stage.processed,
+                         'dropped': stage.dropped}
+            for stage in self.stages
+        }
+        stats['display'] = {'avg_ms': self.display_avg_time * 1000,
+                            'processed': self.frames_displayed, 'dropped': 0}
+        for name, q in self.queues.items():
+            stats[name]['queue_depth'] = q.qsize()
+        return stats
+
+    def draw_stats(self, frame):
+        """Overlay stage times and queue depths on the frame"""
+        y = 110
+        for name, stage_stats in self.get_stats().items():
+            text = f"{name}: {stage_stats['avg_ms']:.1f} ms"
+            if 'queue_depth' in stage_stats:
+                text += f" (queue {stage_stats['queue_depth']})"
+            cv2.putText(frame, text, (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+            y += 20
+
+    def print_stats(self):
+        print("Pipeline statistics:")
+        for name, stage_stats in self.get_stats().items():
+            print(f"  {name}: {stage_stats['avg_ms']:.2f} ms avg, "
+                  f"{stage_stats['processed']} frames, {stage_stats['dropped']} dropped")
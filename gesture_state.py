@@ -0,0 +1,109 @@
+"""
+Gesture debouncing
+Per-frame state machine that turns the noisy stream of recognized gestures
+into confirmed transitions. A gesture is confirmed once it holds a majority
+of the rolling window for a minimum dwell time, and it stays confirmed until
+another gesture (or no gesture) wins such a majority. Actions fire only on
+confirmed transitions, no more often than the cooldown allows; a transition
+inside the cooldown fires once it ends if the gesture is still held.
+"""
+
+import time
+from collections import deque
+
+import config
+
+# No gesture is waiting to be confirmed (None is a valid label: no hand)
+NO_CANDIDATE = object()
+
+
+class GestureStateMachine:
+    def __init__(self, window=None, confirm_votes=None, min_dwell_time=None, cooldown_time=None):
+        if config.ENABLE_GESTURE_HISTORY:
+            window = window or config.GESTURE_HISTORY_SIZE
+            confirm_votes = confirm_votes or config.GESTURE_CONFIRM_VOTES
+            self.min_dwell_time = config.GESTURE_MIN_DWELL_TIME if min_dwell_time is None else min_dwell_time
+        else:
+            # Every frame counts on its own
+            window, confirm_votes, self.min_dwell_time = 1, 1, 0.0
+        # A new gesture needs more than half the window, so the confirmed one
+        # keeps its state through short bursts of other labels (hysteresis)
+        self.confirm_votes = min(confirm_votes, window)
+        self.cooldown_time = config.GESTURE_COOLDOWN_TIME if cooldown_time is None else cooldown_time
+
+        # Rolling window of raw gestures (None = no gesture) and per-label counts
+        self.history = deque(maxlen=window)
+        self.counts = {}
+
+        self.current = None      # confirmed gesture
+        self.candidate = NO_CANDIDATE  # gesture with enough votes, waiting out the dwell time
+        self.candidate_since = 0.0
+        self.last_fired = None   # time of the last action
+        self.pending = False     # current gesture confirmed but not fired yet (cooldown)
+        self.transitioned = False  # whether the last update confirmed a new gesture
+
+        # Statistics
+        self.frames = 0
+        self.transitions = 0
+        self.fired = 0
+        self.suppressed = 0
+
+    def update(self, gesture, timestamp=None):
+        """Add this frame's raw gesture; return the gesture whose action should fire, else None"""
+        timestamp = time.time() if timestamp is None else timestamp
+        self.frames += 1
+        self.transitioned = False
+
+        # O(1) window update: only the outgoing and incoming labels change
+        if len(self.history) == self.history.maxlen:
+            self.counts[self.history[0]] -= 1
+        self.history.append(gesture)
+        self.counts[gesture] = self.counts.get(gesture, 0) + 1
+
+        # Only the incoming label can have just reached the vote threshold,
+        # and only the outgoing one can have dropped below it
+        if gesture != self.current and gesture != self.candidate and \
+                self.counts[gesture] >= self.confirm_votes:
+            self.candidate = gesture
+            self.candidate_since = timestamp
+        elif self.candidate is not NO_CANDIDATE and self.counts[self.candidate] < self.confirm_votes:
+            self.candidate = NO_CANDIDATE
+
+        if self.candidate is NO_CANDIDATE or timestamp - self.candidate_since < self.min_dwell_time:
+            return self._fire_pending(timestamp)
+
+        # Confirmed transition (to None when the hand is gone); a gesture still
+        # waiting out the cooldown is dropped
+        if self.pending:
+            self.suppressed += 1
+        self.current = self.candidate
+        self.candidate = NO_CANDIDATE
+        self.transitions += 1
+        self.transitioned = True
+        self.pending = self.current is not None
+        return self._fire_pending(timestamp)
+
+    def _fire_pending(self, timestamp):
+        """Return the confirmed gesture if it has not fired yet and the cooldown allows"""
+        if not self.pending or \
+                (self.last_fired is not None and timestamp - self.last_fired < self.cooldown_time):
+            return None
+        self.pending = False
+        self.last_fired = timestamp
+        self.fired += 1
+        return self.current
+
+    def reset(self):
+        self.history.clear()
+        self.counts.clear()
+        self.current = None
+        self.candidate = NO_CANDIDATE
+        self.pending = False
+
+    def get_stats(self):
+        return {
+            'frames': self.frames,
+            'transitions': self.transitions,
+            'fired': self.fired,
+            'suppressed': self.suppressed
+        }
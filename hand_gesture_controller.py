@@ -1,46 +1,82 @@
 import cv2
 import mediapipe as mp
-import numpy as np
-import pyautogui
 import time
 import math
-from collections import deque
-import threading
 import pygame
-import pyttsx3
+import config
+from frame_capture import open_camera
+from action_dispatcher import ActionDispatcher
+from input_backends import create_input_backend
+from speech_queue import SpeechQueue
+from inference_scheduler import AdaptiveInferenceScheduler
+from motion_gate import MotionGate
+from idle_mode import IdleMonitor
+from landmarks import LandmarkBuffer, hand_tilt, wrist_position
+from gesture_classifier import GestureClassifier
+from combo_matcher import ComboMatcher
+from hand_tracks import HandTracker
+from qos_governor import LatencyGovernor
+from gesture_pipeline import GesturePipeline, END_OF_STREAM
+from mediapipe_controller import MediaPipeControllerMixin
 
-class HandGestureController:
-    def __init__(self):
+class HandGestureController(MediaPipeControllerMixin):
+    def __init__(self, frame_source=None):
         # Initialize MediaPipe
         self.mp_hands = mp.solutions.hands
         self.mp_drawing = mp.solutions.drawing_utils
         self.mp_drawing_styles = mp.solutions.drawing_styles
         
         # Initialize hands detection
-        self.hands = self.mp_hands.Hands(
-            model_complexity=1,
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.5,
-            max_num_hands=1
-        )
-        
-        # Initialize camera
-        self.cap = cv2.VideoCapture(0)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
+        self.model_complexity = config.MEDIAPIPE_MODEL_COMPLEXITY
+        self.hands = self.create_hands()
+        
+        # Optionally run MediaPipe on a crop around the last hand position
+        self.roi_tracker = self.create_roi_tracker()
+        
+        # Skip inference on some frames and extrapolate landmarks instead
+        self.inference_scheduler = AdaptiveInferenceScheduler() if config.INFERENCE_SKIP_ENABLED else None
+        
+        # Reuse the last empty result while nothing moves in front of the camera
+        self.motion_gate = MotionGate() if config.MOTION_GATE_ENABLED else None
+        
+        # Overlay drawing and inference input scale, lowered by the latency governor
+        self.draw_overlays = config.DRAW_HAND_LANDMARKS
+        self.inference_scale = 1.0
+        self.pending_quality = None
+        self.qos = LatencyGovernor(self.request_quality) if config.QOS_ENABLED else None
+        
+        # Landmark arrays (one slot per hand) reused from frame to frame
+        self.landmark_buffer = LandmarkBuffer(config.MEDIAPIPE_MAX_NUM_HANDS)
+        
+        # Gesture lookup table generated from config.GESTURE_ACTIONS
+        self.gesture_classifier = GestureClassifier()
+        
+        # Initialize camera (frames are read on a background thread)
+        # unless a file/synthetic frame source is given
+        self.cap = frame_source if frame_source is not None else open_camera()
+        
+        # Low-power capture while nobody is in front of the camera
+        self.idle_monitor = IdleMonitor(self.cap) if config.IDLE_MODE_ENABLED else None
+        
+        # Input injection backend (pyautogui, XTest or in-memory recording)
+        self.input = create_input_backend()
+        print(f"Input backend: {self.input.name}")
         
         # Screen dimensions
-        self.screen_width, self.screen_height = pyautogui.size()
+        self.screen_width, self.screen_height = self.input.screen_size()
         
-        # Gesture tracking
-        self.gesture_history = deque(maxlen=10)
+        # OS input injection runs on its own thread
+        self.dispatcher = ActionDispatcher()
+        
+        # Hands keep stable track ids; each has its own gesture state, landmark
+        # and cursor filters, motion recognizer and pinch drag
+        self.hand_tracker = HandTracker(self.dispatcher, self.input)
+        
+        # Gesture tracking (actions fire only on debounced transitions)
+        self.combo_matcher = ComboMatcher() if config.GESTURE_COMBOS_ENABLED else None
         self.last_gesture = None
         self.gesture_cooldown = 0
-        self.cooldown_time = 1.0  # seconds
-        
-        # Hand position tracking
-        self.hand_positions = deque(maxlen=5)
-        self.last_hand_pos = None
+        self.cooldown_time = config.GESTURE_COOLDOWN_TIME
         
         # Volume control
         self.last_volume_gesture = None
@@ -49,10 +85,10 @@ class HandGestureController:
         # Mouse control
         self.mouse_sensitivity = 2.0
         self.last_mouse_pos = None
+        self.frame_time = None  # capture time of the frame being processed
         
-        # Initialize text-to-speech
-        self.tts_engine = pyttsx3.init()
-        self.tts_engine.setProperty('rate', 150)
+        # Initialize text-to-speech (spoken on its own thread)
+        self.speech = SpeechQueue() if config.ENABLE_VOICE_FEEDBACK else None
         
         # Initialize Pygame for virtual robot arm
         pygame.init()
@@ -64,180 +100,26 @@ class HandGestureController:
         self.robot_arm_angles = [0, 0, 0]  # shoulder, elbow, wrist
         self.robot_arm_lengths = [150, 120, 80]
         
-        # Gesture definitions
-        self.gestures = {
-            'open_palm': 'Idle',
-            'fist': 'Stop',
-            'thumbs_up': 'Confirm',
-            'two_fingers': 'Play',
-            'three_fingers': 'Volume Up',
-            'four_fingers': 'Volume Down',
-            'pinch': 'Drag',
-            'point': 'Move Mouse'
-        }
-        
-        # Action mappings
-        self.action_mappings = {
-            'open_palm': self.idle_action,
-            'fist': self.stop_action,
-            'thumbs_up': self.confirm_action,
-            'two_fingers': self.play_action,
-            'three_fingers': self.volume_up_action,
-            'four_fingers': self.volume_down_action,
-            'pinch': self.drag_action,
-            'point': self.move_mouse_action
-        }
-    
-    def calculate_distance(self, point1, point2):
-        """Calculate Euclidean distance between two points"""
-        return math.sqrt((point1[0] - point2[0])**2 + (point1[1] - point2[1])**2)
-    
-    def get_finger_tips(self, hand_landmarks):
-        """Extract finger tip coordinates"""
-        tips = []
-        tip_ids = [4, 8, 12, 16, 20]  # thumb, index, middle, ring, pinky
-        
-        for tip_id in tip_ids:
-            tip = hand_landmarks.landmark[tip_id]
-            tips.append((tip.x, tip.y))
-        
-        return tips
-    
-    def get_finger_bases(self, hand_landmarks):
-        """Extract finger base coordinates"""
-        bases = []
-        base_ids = [2, 5, 9, 13, 17]  # thumb, index, middle, ring, pinky
-        
-        for base_id in base_ids:
-            base = hand_landmarks.landmark[base_id]
-            bases.append((base.x, base.y))
-        
-        return bases
-    
-    def is_finger_extended(self, tip, base, palm_center):
-        """Check if a finger is extended"""
-        tip_to_palm = self.calculate_distance(tip, palm_center)
-        base_to_palm = self.calculate_distance(base, palm_center)
-        return tip_to_palm > base_to_palm * 1.2
-    
-    def recognize_gesture(self, hand_landmarks):
-        """Recognize hand gesture based on finger positions"""
-        if not hand_landmarks:
-            return None
-        
-        # Get finger tips and bases
-        tips = self.get_finger_tips(hand_landmarks)
-        bases = self.get_finger_bases(hand_landmarks)
-        
-        # Get palm center (wrist)
-        wrist = hand_landmarks.landmark[0]
-        palm_center = (wrist.x, wrist.y)
-        
-        # Check finger extensions
-        extended_fingers = []
-        for i, (tip, base) in enumerate(zip(tips, bases)):
-            if self.is_finger_extended(tip, base, palm_center):
-                extended_fingers.append(i)
-        
-        # Gesture recognition logic
-        if len(extended_fingers) == 5:
-            return 'open_palm'
-        elif len(extended_fingers) == 0:
-            return 'fist'
-        elif len(extended_fingers) == 1 and 0 in extended_fingers:  # thumb only
-            return 'thumbs_up'
-        elif len(extended_fingers) == 2 and 1 in extended_fingers and 2 in extended_fingers:
-            return 'two_fingers'
-        elif len(extended_fingers) == 3 and 1 in extended_fingers and 2 in extended_fingers and 3 in extended_fingers:
-            return 'three_fingers'
-        elif len(extended_fingers) == 4 and 1 in extended_fingers and 2 in extended_fingers and 3 in extended_fingers and 4 in extended_fingers:
-            return 'four_fingers'
-        elif len(extended_fingers) == 1 and 1 in extended_fingers:  # index finger only
-            return 'point'
-        
-        # Check for pinch gesture (thumb and index finger close)
-        thumb_tip = tips[0]
-        index_tip = tips[1]
-        if self.calculate_distance(thumb_tip, index_tip) < 0.05:
-            return 'pinch'
-        
-        return None
-    
-    def idle_action(self):
-        """Idle action - no specific action"""
-        pass
-    
-    def stop_action(self):
-        """Stop action - pause media or stop current action"""
-        pyautogui.press('space')
-        self.speak_action("Stop")
-    
-    def confirm_action(self):
-        """Confirm action - click or enter"""
-        pyautogui.click()
-        self.speak_action("Confirm")
-    
-    def play_action(self):
-        """Play action - start media or play"""
-        pyautogui.press('space')
-        self.speak_action("Play")
-    
-    def volume_up_action(self):
-        """Volume up action"""
-        pyautogui.press('volumeup')
-        self.speak_action("Volume Up")
+        # Gesture definitions and action mappings
+        self.init_actions()
     
-    def volume_down_action(self):
-        """Volume down action"""
-        pyautogui.press('volumedown')
-        self.speak_action("Volume Down")
-    
-    def drag_action(self):
-        """Drag action - hold mouse button"""
-        pyautogui.mouseDown()
-        time.sleep(0.1)
-        pyautogui.mouseUp()
-        self.speak_action("Drag")
-    
-    def move_mouse_action(self, hand_pos):
-        """Move mouse based on hand position"""
-        if hand_pos:
-            # Map hand position to screen coordinates
-            screen_x = int(hand_pos[0] * self.screen_width)
-            screen_y = int(hand_pos[1] * self.screen_height)
-            
-            # Apply smoothing
-            if self.last_mouse_pos:
-                screen_x = int(0.7 * screen_x + 0.3 * self.last_mouse_pos[0])
-                screen_y = int(0.7 * screen_y + 0.3 * self.last_mouse_pos[1])
-            
-            pyautogui.moveTo(screen_x, screen_y)
-            self.last_mouse_pos = (screen_x, screen_y)
-    
-    def speak_action(self, action):
+    def announce(self, action):
         """Speak the action being performed"""
-        try:
-            self.tts_engine.say(action)
-            self.tts_engine.runAndWait()
-        except:
-            pass  # Ignore TTS errors
+        if self.speech:
+            self.speech.say(action)
     
-    def update_robot_arm(self, hand_landmarks):
+    def update_robot_arm(self, landmarks):
         """Update robot arm angles based on hand position"""
-        if not hand_landmarks:
+        if landmarks is None:
             return
         
         # Get hand position and orientation
-        wrist = hand_landmarks.landmark[0]
-        middle_finger = hand_landmarks.landmark[12]
-        
-        # Calculate hand tilt
-        hand_tilt = math.atan2(middle_finger.y - wrist.y, middle_finger.x - wrist.x)
+        wrist_x, wrist_y = wrist_position(landmarks)
         
         # Map hand position to robot arm angles
-        self.robot_arm_angles[0] = (wrist.x - 0.5) * 180  # shoulder rotation
-        self.robot_arm_angles[1] = (wrist.y - 0.5) * 180  # elbow angle
-        self.robot_arm_angles[2] = hand_tilt * 180 / math.pi  # wrist rotation
+        self.robot_arm_angles[0] = (wrist_x - 0.5) * 180  # shoulder rotation
+        self.robot_arm_angles[1] = (wrist_y - 0.5) * 180  # elbow angle
+        self.robot_arm_angles[2] = math.degrees(hand_tilt(landmarks))  # wrist rotation
     
     def draw_robot_arm(self):
         """Draw the virtual robot arm"""
@@ -270,88 +152,83 @@ class HandGestureController:
         
         pygame.display.flip()
     
-    def process_frame(self, frame):
-        """Process a single frame and detect gestures"""
-        # Convert BGR to RGB
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
-        # Process the frame
-        results = self.hands.process(rgb_frame)
-        
+    def analyze_results(self, frame, results):
+        """Draw landmarks and recognize the gesture from MediaPipe results"""
         gesture = None
         hand_pos = None
         
-        if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                # Draw hand landmarks
-                self.mp_drawing.draw_landmarks(
-                    frame,
-                    hand_landmarks,
-                    self.mp_hands.HAND_CONNECTIONS,
-                    self.mp_drawing_styles.get_default_hand_landmarks_style(),
-                    self.mp_drawing_styles.get_default_hand_connections_style()
-                )
-                
-                # Recognize gesture
-                gesture = self.recognize_gesture(hand_landmarks)
-                
-                # Get hand position (wrist)
-                wrist = hand_landmarks.landmark[0]
-                hand_pos = (wrist.x, wrist.y)
-                
-                # Update robot arm
-                self.update_robot_arm(hand_landmarks)
+        # The cursor hand (or the only hand) drives the overlay and the robot arm
+        primary = self.track_hands(frame, results)
+        if primary:
+            gesture = primary.gesture
+            hand_pos = primary.hand_pos
+            
+            # Update robot arm
+            self.update_robot_arm(primary.landmarks)
         
         return frame, gesture, hand_pos
     
+    def process_frame(self, frame):
+        """Process a single frame and detect gestures"""
+        results = self.detect_hands(frame)
+        return self.analyze_results(frame, results)
+    
+    def display(self, frame, gesture, frame_time):
+        """Render the robot arm and camera windows, return False to quit"""
+        # While idle the windows keep their last picture; only input is handled
+        if not self.is_idle():
+            # Update robot arm display
+            self.draw_robot_arm()
+            
+            # Display gesture info on camera frame
+            if gesture:
+                cv2.putText(frame, f"Gesture: {self.gestures.get(gesture, 'Unknown')}", 
+                          (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+            
+            # Show capture-to-display latency (and feed it to the latency governor)
+            latency_ms = (time.time() - frame_time) * 1000
+            latency_text = f"Latency: {latency_ms:.0f} ms"
+            if self.qos:
+                self.qos.record(latency_ms / 1000)
+                latency_text += f" (QoS level {self.qos.level})"
+            cv2.putText(frame, latency_text, (10, frame.shape[0] - 20), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+            
+            # Display frame
+            cv2.imshow('Hand Gesture Controller', frame)
+        
+        # Handle Pygame events
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return False
+        
+        # Check for quit
+        return cv2.waitKey(1) & 0xFF != ord('q')
+    
     def run(self):
         """Main application loop"""
         print("Hand Gesture Controller Started!")
         print("Press 'q' to quit")
         
+        if config.PIPELINE_ENABLED:
+            self.run_pipelined()
+            return
+        
         try:
             while True:
-                ret, frame = self.cap.read()
+                ret, frame, frame_time = self.read_frame()
                 if not ret:
                     break
                 
+                self.frame_time = frame_time
+                
                 # Process frame
                 frame, gesture, hand_pos = self.process_frame(frame)
                 
                 # Handle gestures
-                if gesture and gesture != self.last_gesture:
-                    self.last_gesture = gesture
-                    self.gesture_cooldown = time.time()
-                    
-                    # Execute action
-                    if gesture in self.action_mappings:
-                        if gesture == 'point':
-                            self.action_mappings[gesture](hand_pos)
-                        else:
-                            self.action_mappings[gesture]()
-                
-                # Handle mouse movement for point gesture
-                if gesture == 'point' and hand_pos:
-                    self.move_mouse_action(hand_pos)
-                
-                # Update robot arm display
-                self.draw_robot_arm()
-                
-                # Display gesture info on camera frame
-                if gesture:
-                    cv2.putText(frame, f"Gesture: {self.gestures.get(gesture, 'Unknown')}", 
-                              (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+                self.handle_gestures()
                 
-                # Display frame
-                cv2.imshow('Hand Gesture Controller', frame)
-                
-                # Handle Pygame events
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        return
-                
-                # Check for quit
-                if cv2.waitKey(1) & 0xFF == ord('q'):
+                if not self.display(frame, gesture, frame_time):
                     break
                 
                 self.clock.tick(30)
@@ -359,12 +236,48 @@ class HandGestureController:
         finally:
             self.cleanup()
     
+    def run_pipelined(self):
+        """Main loop with capture, inference and recognition on separate threads"""
+        pipeline = GesturePipeline(self)
+        pipeline.start()
+        
+        try:
+            while True:
+                item = pipeline.get()
+                if item is END_OF_STREAM:
+                    break
+                if item is None:
+                    continue
+                
+                # Display runs on the main thread (required by OpenCV/Pygame windows)
+                display_start = time.perf_counter()
+                pipeline.draw_stats(item['frame'])
+                keep_running = self.display(item['frame'], item['gesture'], item['frame_time'])
+                pipeline.record_display_time(time.perf_counter() - display_start)
+                if not keep_running:
+                    break
+        
+        finally:
+            pipeline.stop()
+            pipeline.print_stats()
+            self.cleanup()
+    
     def cleanup(self):
         """Clean up resources"""
+        stats = self.hand_tracker.get_stats()
+        self.hand_tracker.close()
+        self.dispatcher.stop()
+        print(f"Hand tracks: {stats['created']}, gesture transitions: {stats['transitions']}, "
+              f"actions fired: {stats['fired']}, suppressed by cooldown: {stats['suppressed']}")
+        if self.speech:
+            self.speech.stop()
+        stats = self.cap.get_stats()
+        print(f"Frames captured: {stats['captured']}, processed: {stats['delivered']}, "
+              f"dropped: {stats['dropped']}")
         self.cap.release()
         cv2.destroyAllWindows()
         pygame.quit()
-        self.hands.close()
+        self.close_hands()
 
 if __name__ == "__main__":
     controller = HandGestureController()
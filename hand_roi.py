@@ -0,0 +1,136 @@
+"""
+Hand ROI tracking
+Uses the previous frame's landmarks to crop a padded region around the hand,
+runs MediaPipe on a small fixed-size copy of it and maps the landmarks back
+to full-frame normalized coordinates. While fewer hands than the maximum
+are tracked, the full frame is searched again every few frames.
+Crops go to their own Hands instance: a video-mode instance carries its
+tracking rect from one input to the next, so feeding it moving crops and
+full frames in turn leaves that rect in the wrong coordinates.
+"""
+
+import cv2
+import numpy as np
+
+import config
+
+
+def _fit_span(start, length, limit):
+    """Shift [start, start + length) into [0, limit); cut it only if it is longer"""
+    length = int(round(length))
+    if length >= limit:
+        return 0, limit
+    start = min(max(int(round(start)), 0), limit - length)
+    return start, start + length
+
+
+class HandROITracker:
+    def __init__(self, hands, crop_hands, roi_size=None, padding=None, max_hands=None,
+                 redetect_interval=None):
+        self.hands = hands            # full frames
+        self.crop_hands = crop_hands  # ROI crops
+        self.roi_size = roi_size or config.ROI_INPUT_SIZE
+        self.padding = config.ROI_PADDING if padding is None else padding
+        self.max_hands = max_hands or config.MEDIAPIPE_MAX_NUM_HANDS
+        self.redetect_interval = redetect_interval or config.ROI_REDETECT_INTERVAL
+
+        # Hands found in the last frame and ROI frames since the last full-frame search
+        self.tracked_hands = 0
+        self.frames_since_full = 0
+
+        # Current ROI in pixels (x0, y0, x1, y1), None while searching
+        self.roi = None
+
+        # Preallocated input buffer for the resized crop
+        self.roi_buffer = np.empty((self.roi_size, self.roi_size, 3), dtype=np.uint8)
+
+        # Statistics
+        self.roi_frames = 0
+        self.full_frames = 0
+        self.lost_count = 0
+
+    def process(self, rgb_frame):
+        """Drop-in replacement for Hands.process with ROI tracking"""
+        # A new hand outside the ROI can only be found on the full frame
+        if self.roi is not None and self.tracked_hands < self.max_hands and \
+                self.frames_since_full >= self.redetect_interval:
+            self.roi = None
+
+        if self.roi is not None:
+            x0, y0, x1, y1 = self.roi
+            cv2.resize(rgb_frame[y0:y1, x0:x1], (self.roi_size, self.roi_size),
+                       dst=self.roi_buffer, interpolation=cv2.INTER_AREA)
+            results = self.crop_hands.process(self.roi_buffer)
+            self.roi_frames += 1
+            self.frames_since_full += 1
+
+            if results.multi_hand_landmarks:
+                self.tracked_hands = len(results.multi_hand_landmarks)
+                self._map_to_frame(results, rgb_frame.shape)
+                self._update_roi(results, rgb_frame.shape)
+                return results
+
+            # Tracking lost, fall back to a full-frame detection this frame
+            self.lost_count += 1
+            self.roi = None
+
+        results = self.hands.process(rgb_frame)
+        self.full_frames += 1
+        self.frames_since_full = 0
+        self.tracked_hands = len(results.multi_hand_landmarks or [])
+        if results.multi_hand_landmarks:
+            self._update_roi(results, rgb_frame.shape)
+        return results
+
+    def _map_to_frame(self, results, frame_shape):
+        """Convert ROI-normalized landmarks to full-frame normalized coordinates"""
+        height, width = frame_shape[:2]
+        x0, y0, x1, y1 = self.roi
+        scale_x = (x1 - x0) / width
+        scale_y = (y1 - y0) / height
+        offset_x = x0 / width
+        offset_y = y0 / height
+
+        for hand_landmarks in results.multi_hand_landmarks:
+            for landmark in hand_landmarks.landmark:
+                landmark.x = offset_x + landmark.x * scale_x
+                landmark.y = offset_y + landmark.y * scale_y
+                # z is in units of the crop width, like x
+                landmark.z = landmark.z * scale_x
+
+    def _update_roi(self, results, frame_shape):
+        """Set the next ROI to a padded square around all detected hands"""
+        height, width = frame_shape[:2]
+        xs = [lm.x for hand in results.multi_hand_landmarks for lm in hand.landmark]
+        ys = [lm.y for hand in results.multi_hand_landmarks for lm in hand.landmark]
+
+        min_x, max_x = min(xs) * width, max(xs) * width
+        min_y, max_y = min(ys) * height, max(ys) * height
+        center_x = (min_x + max_x) / 2
+        center_y = (min_y + max_y) / 2
+
+        # Square box so the resized crop keeps the hand's aspect ratio
+        side = max(max_x - min_x, max_y - min_y) * (1 + 2 * self.padding)
+        side = max(side, self.roi_size / 2)
+        half = side / 2
+
+        # Near an edge the square is shifted inside the frame rather than cut,
+        # so the resized crop is not stretched
+        x0, x1 = _fit_span(center_x - half, side, width)
+        y0, y1 = _fit_span(center_y - half, side, height)
+
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            self.roi = None
+        else:
+            self.roi = (x0, y0, x1, y1)
+
+    def reset(self):
+        """Forget the current ROI and re-detect on the full frame"""
+        self.roi = None
+
+    def get_stats(self):
+        return {
+            'roi_frames': self.roi_frames,
+            'full_frames': self.full_frames,
+            'lost': self.lost_count
+        }
@@ -0,0 +1,195 @@
+"""
+Multi-hand tracking
+Matches the hands MediaPipe detects in each frame to tracks with stable ids,
+using wrist distance and handedness. Every track owns its own per-hand state
+(landmark filter, gesture state machine, cursor filter, motion recognizer,
+pinch drag) and gets a role from its handedness: with two hands visible the
+right hand drives the cursor and the left hand issues commands.
+"""
+
+import math
+import time
+
+import config
+from landmarks import WRIST
+from landmark_filter import create_landmark_filter
+from gesture_state import GestureStateMachine
+from cursor_filters import create_cursor_filter
+from motion_gestures import MotionGestureRecognizer
+from pinch_drag import PinchDrag
+
+# Gestures that drive the cursor; all others are commands
+CURSOR_GESTURES = ('point', 'pinch')
+
+# Handedness mismatch counts as this much extra wrist distance when matching
+HANDEDNESS_PENALTY = 0.1
+
+
+class HandTrack:
+    def __init__(self, track_id, handedness, dispatcher, input_backend):
+        self.id = track_id
+        self.handedness = handedness
+        self.handedness_score = 1.0 if handedness == 'Right' else -1.0
+        self.role = 'all'
+
+        # Per-hand state
+        self.landmark_filter = create_landmark_filter()
+        self.gesture_state = GestureStateMachine()
+        self.cursor_filter = create_cursor_filter()
+        self.motion_recognizer = MotionGestureRecognizer() if config.MOTION_GESTURES_ENABLED else None
+        self.pinch_drag = PinchDrag(dispatcher, input_backend)
+
+        # Results of the current frame (cleared while the hand is missing)
+        self.visible = False
+        self.wrist = None
+        self.last_seen = None
+        self.landmarks = None
+        self.gesture = None
+        self.hand_pos = None
+        self.pinch_distance = None
+        self.motion_gesture = None
+
+    def handles(self, gesture):
+        """Whether this hand's role lets it trigger the gesture's action"""
+        if self.role == 'all':
+            return True
+        return (gesture in CURSOR_GESTURES) == (self.role == 'cursor')
+
+    def observe(self, wrist, handedness, score, timestamp):
+        self.visible = True
+        self.wrist = wrist
+        self.last_seen = timestamp
+        # MediaPipe's handedness flickers on some frames, so it is smoothed
+        vote = score if handedness == 'Right' else -score
+        self.handedness_score = 0.8 * self.handedness_score + 0.2 * vote
+        self.handedness = 'Right' if self.handedness_score >= 0 else 'Left'
+
+    def miss(self):
+        """The hand was not detected this frame"""
+        self.visible = False
+        self.landmarks = None
+        self.gesture = None
+        self.hand_pos = None
+        self.pinch_distance = None
+        self.motion_gesture = None
+        self.landmark_filter.reset()
+        if self.motion_recognizer:
+            self.motion_recognizer.reset()
+
+    def close(self):
+        self.pinch_drag.release()
+
+
+class HandTracker:
+    def __init__(self, dispatcher, input_backend, max_distance=None, timeout=None):
+        self.dispatcher = dispatcher
+        self.input = input_backend
+        self.max_distance = max_distance or config.HAND_TRACK_MAX_DISTANCE
+        self.timeout = timeout or config.HAND_TRACK_TIMEOUT
+
+        self.tracks = []
+        self.next_id = 1
+
+        # Statistics (gesture counts of expired tracks are kept in finished)
+        self.created = 0
+        self.expired = 0
+        self.finished = {'transitions': 0, 'fired': 0, 'suppressed': 0}
+
+    def update(self, results, timestamp=None):
+        """Assign this frame's detections to tracks
+
+        Returns a list of (track, hand_landmarks) for the detected hands;
+        tracks that were not detected are marked missing, and dropped once
+        they have been missing for longer than the timeout.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        detections = []
+        for i, hand_landmarks in enumerate(results.multi_hand_landmarks or []):
+            wrist = hand_landmarks.landmark[WRIST]
+            handedness, score = 'Right', 0.0
+            if results.multi_handedness and i < len(results.multi_handedness):
+                classification = results.multi_handedness[i].classification[0]
+                handedness, score = classification.label, classification.score
+                if config.HANDEDNESS_SWAPPED:
+                    handedness = 'Left' if handedness == 'Right' else 'Right'
+            detections.append((hand_landmarks, (wrist.x, wrist.y), handedness, score))
+
+        # Greedy nearest matching; hands per frame are few, so pairs are cheap
+        pairs = []
+        for d, (_, wrist, handedness, _) in enumerate(detections):
+            for t, track in enumerate(self.tracks):
+                distance = math.hypot(wrist[0] - track.wrist[0], wrist[1] - track.wrist[1])
+                if distance <= self.max_distance:
+                    cost = distance + (HANDEDNESS_PENALTY if handedness != track.handedness else 0.0)
+                    pairs.append((cost, d, t))
+        pairs.sort()
+
+        assigned = [None] * len(detections)
+        matched_tracks = set()
+        for _, d, t in pairs:
+            if assigned[d] is None and t not in matched_tracks:
+                assigned[d] = self.tracks[t]
+                matched_tracks.add(t)
+
+        matches = []
+        for d, (hand_landmarks, wrist, handedness, score) in enumerate(detections):
+            track = assigned[d]
+            if track is None:
+                track = HandTrack(self.next_id, handedness, self.dispatcher, self.input)
+                self.next_id += 1
+                self.created += 1
+                self.tracks.append(track)
+            track.observe(wrist, handedness, score, timestamp)
+            matches.append((track, hand_landmarks))
+
+        matched = {id(track) for track, _ in matches}
+        for track in self.tracks:
+            if id(track) not in matched and track.visible:
+                track.miss()
+        self._expire(timestamp)
+        self._assign_roles()
+        return matches
+
+    def _expire(self, timestamp):
+        alive = []
+        for track in self.tracks:
+            if not track.visible and timestamp - track.last_seen > self.timeout:
+                track.close()
+                self.expired += 1
+                for key, value in track.gesture_state.get_stats().items():
+                    if key in self.finished:
+                        self.finished[key] += value
+            else:
+                alive.append(track)
+        self.tracks = alive
+
+    def _assign_roles(self):
+        # A single hand does everything; two hands split the work by handedness
+        visible = [track for track in self.tracks if track.visible]
+        for track in self.tracks:
+            if len(visible) <= 1:
+                track.role = 'all'
+            else:
+                track.role = config.HAND_ROLES.get(track.handedness, 'all')
+
+    def primary(self):
+        """The visible hand that drives the cursor (or the oldest visible one)"""
+        visible = [track for track in self.tracks if track.visible]
+        for track in visible:
+            if track.role in ('cursor', 'all'):
+                return track
+        return visible[0] if visible else None
+
+    def close(self):
+        for track in self.tracks:
+            track.close()
+        self.tracks = []
+
+    def get_stats(self):
+        stats = {'tracks': len(self.tracks), 'created': self.created, 'expired': self.expired}
+        stats.update(self.finished)
+        for track in self.tracks:
+            for key, value in track.gesture_state.get_stats().items():
+                if key in stats:
+                    stats[key] += value
+        return stats
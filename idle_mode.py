@@ -0,0 +1,95 @@
+"""
+Idle low-power mode
+After no hand has been seen for config.IDLE_TIMEOUT seconds the camera is
+switched to a low resolution and frame rate and the controllers stop
+drawing overlays and refreshing their windows, only watching for motion or
+a hand. Either one switches back to full capture on the same frame.
+Changing the capture size changes the picture itself, so motion is ignored
+for a few frames after each switch.
+Wall-clock and process CPU time are accounted separately for each state.
+"""
+
+import time
+import cv2
+
+import config
+
+
+class IdleMonitor:
+    def __init__(self, capture, timeout=None, idle_size=None, idle_fps=None, settle_frames=None):
+        self.capture = capture
+        self.timeout = timeout or config.IDLE_TIMEOUT
+        self.idle_size = idle_size or (config.IDLE_CAMERA_WIDTH, config.IDLE_CAMERA_HEIGHT)
+        self.idle_fps = idle_fps or config.IDLE_CAMERA_FPS
+        self.settle_frames = config.IDLE_SETTLE_FRAMES if settle_frames is None else settle_frames
+
+        self.idle = False
+        self.last_activity = time.time()
+        self.last_frame = 0.0  # perf_counter time of the last idle frame read
+        self.settling = 0      # frames left in which motion is ignored after a switch
+
+        # Time accounting: state -> [wall seconds, CPU seconds]
+        self.times = {'active': [0.0, 0.0], 'idle': [0.0, 0.0]}
+        self.mark_wall = time.perf_counter()
+        self.mark_cpu = time.process_time()
+
+        # Statistics
+        self.idle_entries = 0
+
+    def wait(self):
+        """Sleep until the next idle frame is due (no-op while active)"""
+        if not self.idle:
+            return
+        delay = self.last_frame + 1.0 / self.idle_fps - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        self.last_frame = time.perf_counter()
+
+    def update(self, hand_present, motion, timestamp=None):
+        """Report this frame's activity; return 'idle' or 'active' on a switch, else None"""
+        timestamp = time.time() if timestamp is None else timestamp
+        if self.settling:
+            self.settling -= 1
+            motion = False
+        if hand_present or (self.idle and motion):
+            self.last_activity = timestamp
+            if self.idle:
+                self._switch(False)
+                return 'active'
+        elif not self.idle and timestamp - self.last_activity > self.timeout:
+            self._switch(True)
+            return 'idle'
+        return None
+
+    def _switch(self, idle):
+        self._account()
+        self.idle = idle
+        self.settling = self.settle_frames
+        if idle:
+            self.idle_entries += 1
+            width, height = self.idle_size
+            fps = self.idle_fps
+        else:
+            width, height, fps = config.CAMERA_WIDTH, config.CAMERA_HEIGHT, config.CAMERA_FPS
+        self.capture.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.capture.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        self.capture.set(cv2.CAP_PROP_FPS, fps)
+        print(f"{'Idle' if idle else 'Active'} mode: capturing {width}x{height} @ {fps} FPS")
+
+    def _account(self):
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        totals = self.times['idle' if self.idle else 'active']
+        totals[0] += wall - self.mark_wall
+        totals[1] += cpu - self.mark_cpu
+        self.mark_wall = wall
+        self.mark_cpu = cpu
+
+    def get_stats(self):
+        """Seconds spent and CPU use (% of one core) in each state"""
+        self._account()
+        stats = {'idle_entries': self.idle_entries}
+        for state, (wall, cpu) in self.times.items():
+            stats[f'{state}_s'] = wall
+            stats[f'{state}_cpu'] = cpu / wall * 100 if wall > 0 else 0.0
+        return stats
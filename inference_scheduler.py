@@ -0,0 +1,161 @@
+"""
+Adaptive inference skipping
+Runs MediaPipe only every Nth frame (or when the hand is predicted to move
+too far) and fills the frames in between with landmarks extrapolated from
+the measured landmark velocity. N adapts to how fast the hand moves.
+Landmark arrays and the extrapolated result objects are preallocated and
+reused, so skipped frames allocate (almost) nothing.
+"""
+
+import time
+import numpy as np
+from mediapipe.framework.formats import landmark_pb2
+
+import config
+from landmarks import NUM_LANDMARKS, LandmarkBuffer, wire_records
+
+
+class PredictedResults:
+    """Stand-in for a MediaPipe results object on skipped frames"""
+
+    def __init__(self, max_hands):
+        self.messages = [landmark_pb2.NormalizedLandmarkList() for _ in range(max_hands)]
+        self.multi_hand_landmarks = []
+        self.multi_handedness = None
+
+
+class AdaptiveInferenceScheduler:
+    def __init__(self, max_skip=None, motion_threshold=None, fast_speed=None):
+        self.max_skip = max_skip or config.INFERENCE_SKIP_MAX_FRAMES
+        self.motion_threshold = motion_threshold or config.INFERENCE_SKIP_MOTION_THRESHOLD
+        self.fast_speed = fast_speed or config.INFERENCE_SKIP_FAST_SPEED
+
+        # Last inferred landmarks and their velocity, one row block per hand;
+        # views into the buffers below
+        self.landmarks = None   # (hands, 21, 3)
+        self.velocity = None    # (hands, 21, 3) in normalized units per second
+        self.last_time = None
+        self.last_handedness = None
+
+        # Two landmark buffers swapped on every inference, so the previous
+        # landmarks survive while the new ones are read in
+        max_hands = config.MEDIAPIPE_MAX_NUM_HANDS
+        shape = (max_hands, NUM_LANDMARKS, 3)
+        self.buffers = [LandmarkBuffer(max_hands), LandmarkBuffer(max_hands)]
+        self.current = 0
+        self.velocity_buffer = np.zeros(shape, dtype=np.float32)
+        self.delta = np.empty(shape, dtype=np.float32)
+        self.predicted = np.empty(shape, dtype=np.float32)
+        self.wire = wire_records(max_hands)
+
+        # Extrapolated results cycle through a ring of reused objects: with the
+        # threaded pipeline up to PIPELINE_QUEUE_SIZE earlier predictions may
+        # wait in the recognition queue while one more is being recognized
+        self.results_ring = [PredictedResults(max_hands) for _ in range(config.PIPELINE_QUEUE_SIZE + 2)]
+        self.ring_index = 0
+
+        self.frames_since_inference = 0
+        self.skip_interval = 1
+
+        # Statistics
+        self.inferred_frames = 0
+        self.predicted_frames = 0
+
+    def process(self, frame, infer):
+        """Return infer(frame) or predicted results for this frame"""
+        now = time.perf_counter()
+        if self.should_infer(now):
+            results = infer(frame)
+            self.update(results, now)
+            return results
+
+        self.frames_since_inference += 1
+        self.predicted_frames += 1
+        return self.predict(now)
+
+    def should_infer(self, now):
+        """Decide whether this frame needs a real MediaPipe pass"""
+        if self.landmarks is None or self.velocity is None:
+            return True
+        if self.frames_since_inference + 1 >= self.skip_interval:
+            return True
+
+        # Infer early if the extrapolated motion is already large
+        elapsed = now - self.last_time
+        predicted_motion = np.abs(self.velocity).max() * elapsed
+        return predicted_motion > self.motion_threshold
+
+    def update(self, results, now):
+        """Record a real inference result and adapt the skip interval"""
+        self.inferred_frames += 1
+        self.frames_since_inference = 0
+
+        if not results.multi_hand_landmarks:
+            self.landmarks = None
+            self.velocity = None
+            self.skip_interval = 1
+            return
+
+        hands = len(results.multi_hand_landmarks)
+        self.current ^= 1
+        buffer = self.buffers[self.current]
+        for slot, hand_landmarks in enumerate(results.multi_hand_landmarks):
+            buffer.fill(hand_landmarks, slot)
+        landmarks = buffer.arrays[:hands]
+
+        if self.landmarks is not None and len(self.landmarks) == hands:
+            elapsed = max(now - self.last_time, 1e-3)
+            delta = self.delta[:hands]
+            velocity = self.velocity_buffer[:hands]
+            np.subtract(landmarks, self.landmarks, out=delta)
+            if self.velocity is not None:
+                # Light smoothing so a single noisy detection doesn't dominate
+                delta *= 0.5 / elapsed
+                velocity *= 0.5
+                velocity += delta
+            else:
+                np.divide(delta, elapsed, out=velocity)
+            self.velocity = velocity
+        else:
+            self.velocity = None
+
+        self.landmarks = landmarks
+        self.last_time = now
+        self.last_handedness = results.multi_handedness
+
+        # Slow hands get the full skip interval, fast hands are inferred every frame
+        if self.velocity is None:
+            self.skip_interval = 1
+        else:
+            speed = float(np.linalg.norm(self.velocity[:, 0, :2], axis=-1).max())
+            ratio = min(speed / self.fast_speed, 1.0)
+            self.skip_interval = max(1, int(round(self.max_skip * (1.0 - ratio))))
+
+    def predict(self, now):
+        """Extrapolate the last landmarks to the current time"""
+        elapsed = now - self.last_time
+        hands = len(self.landmarks)
+        predicted = self.predicted[:hands]
+        np.multiply(self.velocity, elapsed, out=predicted)
+        predicted += self.landmarks
+
+        # Write the landmarks in wire format and parse them into the next
+        # ring entry's messages in one call per hand
+        records = self.wire[:hands]
+        records['x'] = predicted[..., 0]
+        records['y'] = predicted[..., 1]
+        records['z'] = predicted[..., 2]
+        results = self.results_ring[self.ring_index]
+        self.ring_index = (self.ring_index + 1) % len(self.results_ring)
+        for message, hand_records in zip(results.messages, records):
+            message.ParseFromString(hand_records.tobytes())
+        results.multi_hand_landmarks = results.messages[:hands]
+        results.multi_handedness = self.last_handedness
+        return results
+
+    def get_stats(self):
+        return {
+            'inferred': self.inferred_frames,
+            'predicted': self.predicted_frames,
+            'skip_interval': self.skip_interval
+        }
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Input injection backends
+All cursor and key output from the *_action methods goes through one of these:
+a tuned pyautogui backend, a direct X11 XTest backend (Linux) and an
+in-memory recording backend for tests. Each backend tracks its achievable
+events per second from the events it injects; run this module to measure it
+on demand (this moves the real cursor in place).
+"""
+
+import os
+import sys
+import time
+
+import config
+
+
+class InputBackend:
+    name = 'base'
+
+    def __init__(self):
+        # Exponential moving average of the time one injected event takes
+        self.avg_event_time = None
+        self.events = 0
+
+    def _timed(self, func, *args):
+        start = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - start
+        self.avg_event_time = elapsed if self.avg_event_time is None else \
+            0.9 * self.avg_event_time + 0.1 * elapsed
+        self.events += 1
+
+    # Public API used by the controllers
+
+    def move_to(self, x, y):
+        self._timed(self._move_to, int(x), int(y))
+
+    def press(self, key):
+        self._timed(self._press, key)
+
+    def click(self):
+        self._timed(self._click)
+
+    def mouse_down(self):
+        self._timed(self._mouse_down)
+
+    def mouse_up(self):
+        self._timed(self._mouse_up)
+
+    def events_per_second(self):
+        """Achievable event rate measured from the injected events so far"""
+        if not self.avg_event_time:
+            return float('inf') if self.avg_event_time == 0 else 0.0
+        return 1.0 / self.avg_event_time
+
+    def measure(self, samples=20):
+        """Measure the event rate by moving the cursor to where it already is
+
+        This injects real events, so it is only run on demand, never at startup.
+        """
+        x, y = self.position()
+        for _ in range(samples):
+            self.move_to(x, y)
+        return self.events_per_second()
+
+    # Backend implementations
+
+    def screen_size(self):
+        raise NotImplementedError
+
+    def position(self):
+        raise NotImplementedError
+
+    def _move_to(self, x, y):
+        raise NotImplementedError
+
+    def _press(self, key):
+        raise NotImplementedError
+
+    def _click(self):
+        self._mouse_down()
+        self._mouse_up()
+
+    def _mouse_down(self):
+        raise NotImplementedError
+
+    def _mouse_up(self):
+        raise NotImplementedError
+
+
+class PyAutoGUIBackend(InputBackend):
+    name = 'pyautogui'
+
+    def __init__(self):
+        super().__init__()
+        import pyautogui
+        self.pyautogui = pyautogui
+
+        # pyautogui sleeps PAUSE seconds after every call by default
+        pyautogui.PAUSE = config.INPUT_PYAUTOGUI_PAUSE
+        pyautogui.MINIMUM_DURATION = 0
+        pyautogui.FAILSAFE = config.INPUT_FAILSAFE
+
+    def screen_size(self):
+        return tuple(self.pyautogui.size())
+
+    def position(self):
+        return tuple(self.pyautogui.position())
+
+    def _move_to(self, x, y):
+        self.pyautogui.moveTo(x, y, _pause=False)
+
+    def _press(self, key):
+        self.pyautogui.press(key, _pause=False)
+
+    def _click(self):
+        self.pyautogui.click(_pause=False)
+
+    def _mouse_down(self):
+        self.pyautogui.mouseDown(_pause=False)
+
+    def _mouse_up(self):
+        self.pyautogui.mouseUp(_pause=False)
+
+
+class XTestBackend(InputBackend):
+    """Injects events straight into the X server through the XTest extension"""
+    name = 'xtest'
+
+    # pyautogui key names that differ from X keysym names
+    KEY_NAMES = {
+        'enter': 'Return',
+        'return': 'Return',
+        'esc': 'Escape',
+        'left': 'Left',
+        'right': 'Right',
+        'up': 'Up',
+        'down': 'Down',
+        'pageup': 'Prior',
+        'pagedown': 'Next',
+        'backspace': 'BackSpace',
+        'home': 'Home',
+        'end': 'End',
+        'volumeup': 'XF86AudioRaiseVolume',
+        'volumedown': 'XF86AudioLowerVolume',
+        'volumemute': 'XF86AudioMute',
+        'playpause': 'XF86AudioPlay',
+        'nexttrack': 'XF86AudioNext',
+        'prevtrack': 'XF86AudioPrev'
+    }
+
+    def __init__(self):
+        super().__init__()
+        from Xlib import X, XK, display
+        from Xlib.ext import xtest
+        self.X = X
+        self.XK = XK
+        self.xtest = xtest
+        self.display = display.Display()
+        if not self.display.has_extension('XTEST'):
+            raise RuntimeError("X server has no XTEST extension")
+        XK.load_keysym_group('xf86')
+        self.root = self.display.screen().root
+
+    def screen_size(self):
+        screen = self.display.screen()
+        return screen.width_in_pixels, screen.height_in_pixels
+
+    def position(self):
+        pointer = self.root.query_pointer()
+        return pointer.root_x, pointer.root_y
+
+    def _move_to(self, x, y):
+        self.xtest.fake_input(self.display, self.X.MotionNotify, x=x, y=y)
+        self.display.flush()
+
+    def _press(self, key):
+        keysym = self.XK.string_to_keysym(self.KEY_NAMES.get(key, key))
+        keycode = self.display.keysym_to_keycode(keysym)
+        if not keycode:
+            raise ValueError(f"No keycode for key '{key}'")
+        self.xtest.fake_input(self.display, self.X.KeyPress, keycode)
+        self.xtest.fake_input(self.display, self.X.KeyRelease, keycode)
+        self.display.flush()
+
+    def _mouse_down(self):
+        self.xtest.fake_input(self.display, self.X.ButtonPress, 1)
+        self.display.flush()
+
+    def _mouse_up(self):
+        self.xtest.fake_input(self.display, self.X.ButtonRelease, 1)
+        self.display.flush()
+
+
+class RecordingBackend(InputBackend):
+    """Records events in memory instead of sending them to the OS"""
+    name = 'recording'
+
+    def __init__(self, screen_size=(1920, 1080)):
+        super().__init__()
+        self.size = screen_size
+        self.cursor = (screen_size[0] // 2, screen_size[1] // 2)
+        self.recorded = []  # (timestamp, event, args)
+
+    def _record(self, event, *args):
+        self.recorded.append((time.time(), event, args))
+
+    def screen_size(self):
+        return self.size
+
+    def position(self):
+        return self.cursor
+
+    def _move_to(self, x, y):
+        self.cursor = (x, y)
+        self._record('move_to', x, y)
+
+    def _press(self, key):
+        self._record('press', key)
+
+    def _click(self):
+        self._record('click')
+
+    def _mouse_down(self):
+        self._record('mouse_down')
+
+    def _mouse_up(self):
+        self._record('mouse_up')
+
+
+def create_input_backend(name=None):
+    """Create the configured input backend ('auto' prefers XTest on X11)"""
+    name = name or config.INPUT_BACKEND
+
+    if name == 'recording':
+        return RecordingBackend()
+    if name == 'xtest' or (name == 'auto' and sys.platform.startswith('linux')
+                           and os.environ.get('DISPLAY')):
+        try:
+            return XTestBackend()
+        except Exception as e:
+            if name == 'xtest':
+                raise
+            print(f"XTest input backend unavailable ({e}), using pyautogui")
+    return PyAutoGUIBackend()
+
+
+if __name__ == "__main__":
+    backend = create_input_backend(sys.argv[1] if len(sys.argv) > 1 else None)
+    print(f"{backend.name}: ~{backend.measure():.0f} events/s")
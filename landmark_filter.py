@@ -0,0 +1,137 @@
+"""
+Temporal landmark smoothing
+Filters the whole (21, 3) landmark array in one vectorized step per frame,
+with either a One-Euro filter or a constant-velocity Kalman filter. All state
+lives in preallocated arrays that are updated in place.
+"""
+
+import time
+import numpy as np
+
+import config
+from landmarks import NUM_LANDMARKS
+
+SHAPE = (NUM_LANDMARKS, 3)
+
+
+class LandmarkOneEuroFilter:
+    """One-Euro filter per landmark; each landmark's cutoff follows its own speed"""
+
+    def __init__(self, min_cutoff=None, beta=None, d_cutoff=None):
+        self.min_cutoff = min_cutoff or config.LANDMARK_ONE_EURO_MIN_CUTOFF
+        self.beta = config.LANDMARK_ONE_EURO_BETA if beta is None else beta
+        self.d_cutoff = d_cutoff or config.LANDMARK_ONE_EURO_D_CUTOFF
+
+        self.x = np.zeros(SHAPE, dtype=np.float32)      # filtered landmarks
+        self.dx = np.zeros(SHAPE, dtype=np.float32)     # filtered velocity
+        self.delta = np.zeros(SHAPE, dtype=np.float32)  # scratch
+        self.alpha = np.zeros((NUM_LANDMARKS, 1), dtype=np.float32)
+        self.initialized = False
+        self.last_time = None
+
+    def reset(self):
+        self.initialized = False
+
+    def filter(self, landmarks, timestamp=None):
+        """Return the smoothed landmarks (a view of internal state, valid until the next call)"""
+        timestamp = time.time() if timestamp is None else timestamp
+        if not self.initialized:
+            self.x[:] = landmarks
+            self.dx.fill(0)
+            self.last_time = timestamp
+            self.initialized = True
+            return self.x
+
+        dt = timestamp - self.last_time
+        if dt <= 0:
+            return self.x
+        self.last_time = timestamp
+
+        # delta = landmarks - x, velocity = delta / dt
+        np.subtract(landmarks, self.x, out=self.delta)
+        d_alpha = 1.0 / (1.0 + 1.0 / (2 * np.pi * self.d_cutoff * dt))
+        self.dx += d_alpha * (self.delta / dt - self.dx)
+
+        # Per-landmark cutoff from the landmark's speed
+        speed = np.sqrt(np.einsum('ij,ij->i', self.dx, self.dx))
+        cutoff = self.min_cutoff + self.beta * speed
+        np.divide(1.0, 1.0 + 1.0 / (2 * np.pi * cutoff[:, None] * dt), out=self.alpha)
+
+        self.delta *= self.alpha
+        self.x += self.delta
+        return self.x
+
+
+class LandmarkKalmanFilter:
+    """Independent constant-velocity Kalman filter for every landmark coordinate"""
+
+    def __init__(self, process_noise=None, measurement_noise=None):
+        self.q = process_noise or config.LANDMARK_KALMAN_PROCESS_NOISE
+        self.r = measurement_noise or config.LANDMARK_KALMAN_MEASUREMENT_NOISE
+
+        # State (position, velocity) and the symmetric 2x2 covariance per coordinate
+        self.x = np.zeros(SHAPE, dtype=np.float32)
+        self.v = np.zeros(SHAPE, dtype=np.float32)
+        self.p00 = np.zeros(SHAPE, dtype=np.float32)
+        self.p01 = np.zeros(SHAPE, dtype=np.float32)
+        self.p11 = np.zeros(SHAPE, dtype=np.float32)
+        self.innovation = np.zeros(SHAPE, dtype=np.float32)
+        self.initialized = False
+        self.last_time = None
+
+    def reset(self):
+        self.initialized = False
+
+    def filter(self, landmarks, timestamp=None):
+        """Return the smoothed landmarks (a view of internal state, valid until the next call)"""
+        timestamp = time.time() if timestamp is None else timestamp
+        if not self.initialized:
+            self.x[:] = landmarks
+            self.v.fill(0)
+            self.p00.fill(self.r)
+            self.p01.fill(0)
+            self.p11.fill(1.0)
+            self.last_time = timestamp
+            self.initialized = True
+            return self.x
+
+        dt = timestamp - self.last_time
+        if dt <= 0:
+            return self.x
+        self.last_time = timestamp
+
+        # Predict: x += v * dt, P = F P F^T + Q (white-noise acceleration model)
+        self.x += self.v * dt
+        self.p00 += dt * (2 * self.p01 + dt * self.p11) + self.q * dt ** 4 / 4
+        self.p01 += dt * self.p11 + self.q * dt ** 3 / 2
+        self.p11 += self.q * dt ** 2
+
+        # Update with the measured position
+        np.subtract(landmarks, self.x, out=self.innovation)
+        s = self.p00 + self.r
+        k0 = self.p00 / s
+        k1 = self.p01 / s
+        self.x += k0 * self.innovation
+        self.v += k1 * self.innovation
+        self.p11 -= k1 * self.p01
+        self.p01 *= 1 - k0
+        self.p00 *= 1 - k0
+        return self.x
+
+
+class PassthroughLandmarkFilter:
+    def reset(self):
+        pass
+
+    def filter(self, landmarks, timestamp=None):
+        return landmarks
+
+
+def create_landmark_filter(name=None):
+    """Create the landmark filter configured in config.py"""
+    name = name or config.LANDMARK_FILTER
+    if name == 'kalman':
+        return LandmarkKalmanFilter()
+    if name == 'one_euro':
+        return LandmarkOneEuroFilter()
+    return PassthroughLandmarkFilter()
@@ -0,0 +1,110 @@
+"""
+Compact landmark representation
+Converts each MediaPipe hand into a preallocated (21, 3) float32 array once
+per frame; finger extension, pinch distance, tilt and wrist position are all
+computed from that array with vectorized NumPy operations
+"""
+
+import numpy as np
+
+import config
+
+NUM_LANDMARKS = 21
+
+# Landmark indices
+WRIST = 0
+THUMB_TIP = 4
+INDEX_TIP = 8
+MIDDLE_TIP = 12
+TIP_IDS = np.array([4, 8, 12, 16, 20])   # thumb, index, middle, ring, pinky
+BASE_IDS = np.array([2, 5, 9, 13, 17])   # thumb, index, middle, ring, pinky
+
+
+# Protobuf wire layout of one NormalizedLandmark holding exactly x, y and z,
+# which is what MediaPipe Hands returns: the field key and length, then three
+# tagged little-endian floats. A whole hand is read or written with one C-level
+# (de)serialization instead of 63 Python attribute accesses.
+LANDMARK_WIRE = np.dtype([('key', 'u1'), ('length', 'u1'),
+                          ('x_tag', 'u1'), ('x', '<f4'),
+                          ('y_tag', 'u1'), ('y', '<f4'),
+                          ('z_tag', 'u1'), ('z', '<f4')])
+WIRE_HEADER = {'key': 0x0a, 'length': LANDMARK_WIRE.itemsize - 2,
+               'x_tag': 0x0d, 'y_tag': 0x15, 'z_tag': 0x1d}
+WIRE_SIZE = NUM_LANDMARKS * LANDMARK_WIRE.itemsize
+
+# Byte offsets of the header fields in a serialized hand and their expected values
+_HEADER_OFFSETS = np.array([i * LANDMARK_WIRE.itemsize + LANDMARK_WIRE.fields[name][1]
+                            for i in range(NUM_LANDMARKS) for name in WIRE_HEADER])
+_HEADER_BYTES = np.tile(np.array(list(WIRE_HEADER.values()), dtype=np.uint8), NUM_LANDMARKS)
+
+
+def wire_records(hands=1):
+    """(hands, 21) landmark records with the wire header filled in, ready for x, y, z"""
+    records = np.zeros((hands, NUM_LANDMARKS), dtype=LANDMARK_WIRE)
+    for name, value in WIRE_HEADER.items():
+        records[name] = value
+    return records
+
+
+class LandmarkBuffer:
+    """(hands, 21, 3) float32 landmark array reused from frame to frame"""
+
+    def __init__(self, max_hands=1):
+        self.arrays = np.zeros((max_hands, NUM_LANDMARKS, 3), dtype=np.float32)
+        self.array = self.arrays[0]
+
+    def fill(self, hand_landmarks, slot=0):
+        """Copy a MediaPipe NormalizedLandmarkList into a slot and return that (21, 3) view"""
+        return to_landmark_array(hand_landmarks, self.arrays[slot])
+
+
+def to_landmark_array(hand_landmarks, out=None):
+    """Copy a MediaPipe NormalizedLandmarkList into out (a (21, 3) float32 array,
+    new if None) and return it"""
+    if out is None:
+        out = np.empty((NUM_LANDMARKS, 3), dtype=np.float32)
+    data = hand_landmarks.SerializeToString()
+    if len(data) == WIRE_SIZE and \
+            np.array_equal(np.frombuffer(data, dtype=np.uint8)[_HEADER_OFFSETS], _HEADER_BYTES):
+        records = np.frombuffer(data, dtype=LANDMARK_WIRE)
+        out[:, 0] = records['x']
+        out[:, 1] = records['y']
+        out[:, 2] = records['z']
+    else:
+        # Landmarks with visibility or presence set: read the fields one by one
+        out.reshape(-1)[:] = [v for lm in hand_landmarks.landmark for v in (lm.x, lm.y, lm.z)]
+    return out
+
+
+# Distances are computed in float64 so results match the original per-point
+# math.sqrt rules exactly at the threshold boundaries. Feature functions accept
+# a single (21, 3) hand or a batch of shape (N, 21, 3).
+
+def finger_extension_mask(landmarks, threshold=None):
+    """Return a (..., 5) bool array: tip farther from the wrist than base * threshold"""
+    threshold = config.FINGER_EXTENSION_THRESHOLD if threshold is None else threshold
+    points = np.asarray(landmarks)[..., :2].astype(np.float64)
+    wrist = points[..., WRIST:WRIST + 1, :]
+    tip_offsets = points[..., TIP_IDS, :] - wrist
+    base_offsets = points[..., BASE_IDS, :] - wrist
+    tip_to_palm = np.sqrt((tip_offsets ** 2).sum(axis=-1))
+    base_to_palm = np.sqrt((base_offsets ** 2).sum(axis=-1))
+    return tip_to_palm > base_to_palm * threshold
+
+
+def pinch_distance(landmarks):
+    """Distance between thumb tip and index tip in normalized image units"""
+    landmarks = np.asarray(landmarks)
+    offset = landmarks[..., THUMB_TIP, :2].astype(np.float64) - landmarks[..., INDEX_TIP, :2]
+    return np.sqrt((offset ** 2).sum(axis=-1))
+
+
+def hand_tilt(landmarks):
+    """Angle (radians) of the wrist -> middle finger tip vector"""
+    dx, dy = (landmarks[MIDDLE_TIP, :2].astype(np.float64) - landmarks[WRIST, :2]).tolist()
+    return float(np.arctan2(dy, dx))
+
+
+def wrist_position(landmarks):
+    """Normalized (x, y) wrist position"""
+    return float(landmarks[WRIST, 0]), float(landmarks[WRIST, 1])
@@ -0,0 +1,342 @@
+"""
+Shared MediaPipe controller code
+Hand detection, latency-governor quality switching, per-hand analysis and
+gesture-to-action routing used by both MediaPipe controllers. A controller
+creates the components in its __init__ and overrides announce() to report
+actions its own way (printed here, spoken by the full controller).
+"""
+
+import time
+from functools import partial
+import cv2
+
+import config
+from landmarks import pinch_distance, wrist_position
+from hand_tracks import CURSOR_GESTURES
+from hand_roi import HandROITracker
+
+
+class MediaPipeControllerMixin:
+    def init_actions(self):
+        """Gesture names and the action each gesture fires"""
+        self.gestures = {
+            'open_palm': 'Idle',
+            'fist': 'Stop',
+            'thumbs_up': 'Confirm',
+            'two_fingers': 'Play',
+            'three_fingers': 'Volume Up',
+            'four_fingers': 'Volume Down',
+            'pinch': 'Drag',
+            'point': 'Move Mouse'
+        }
+
+        self.action_mappings = {
+            'open_palm': self.idle_action,
+            'fist': self.stop_action,
+            'thumbs_up': self.confirm_action,
+            'two_fingers': self.play_action,
+            'three_fingers': self.volume_up_action,
+            'four_fingers': self.volume_down_action,
+            'pinch': self.drag_action,
+            'point': self.move_mouse_action
+        }
+
+        # Motion gestures press the key configured for their action
+        for name, spec in config.GESTURE_ACTIONS.items():
+            if spec.get('motion'):
+                self.gestures[name] = spec['name']
+                self.action_mappings[name] = partial(self.key_action, spec['action'], spec['name'])
+
+    def create_hands(self, static_image_mode=False):
+        """Create the MediaPipe Hands solution at the current model complexity"""
+        return self.mp_hands.Hands(
+            static_image_mode=static_image_mode,
+            model_complexity=self.model_complexity,
+            min_detection_confidence=config.MEDIAPIPE_MIN_DETECTION_CONFIDENCE,
+            min_tracking_confidence=config.MEDIAPIPE_MIN_TRACKING_CONFIDENCE,
+            max_num_hands=config.MEDIAPIPE_MAX_NUM_HANDS
+        )
+
+    def create_roi_tracker(self):
+        """ROI tracker with its own Hands instance for the crops, or None if disabled"""
+        if not config.ROI_TRACKING_ENABLED:
+            return None
+        # Crops carry no tracking state over from one frame to the next
+        return HandROITracker(self.hands, self.create_hands(static_image_mode=True))
+
+    def request_quality(self, settings):
+        """Latency governor callback; applied before the next inference"""
+        self.pending_quality = settings
+
+    def apply_quality(self, settings):
+        """Switch overlays, inference scale, frame skipping and model complexity"""
+        self.draw_overlays = settings['draw_overlays']
+        if settings['inference_scale'] != self.inference_scale:
+            # The tracked ROI is in pixels of the old inference input
+            self.inference_scale = settings['inference_scale']
+            if self.roi_tracker:
+                self.roi_tracker.reset()
+        if self.inference_scheduler:
+            self.inference_scheduler.max_skip = settings['max_skip']
+
+        if settings['model_complexity'] != self.model_complexity:
+            # Complexity is fixed per Hands instance, so the solution is recreated
+            self.hands.close()
+            self.model_complexity = settings['model_complexity']
+            self.hands = self.create_hands()
+            if self.roi_tracker:
+                self.roi_tracker.crop_hands.close()
+                self.roi_tracker = self.create_roi_tracker()
+
+    def is_idle(self):
+        """Whether the low-power idle mode is on"""
+        return self.idle_monitor is not None and self.idle_monitor.idle
+
+    def read_frame(self):
+        """Read the newest frame, throttled to the idle frame rate while idle"""
+        if self.idle_monitor:
+            self.idle_monitor.wait()
+        return self.cap.read_latest()
+
+    def recognize_gesture(self, landmarks):
+        """Recognize hand gesture from a (21, 3) landmark array"""
+        if landmarks is None:
+            return None
+
+        # Finger-extension bitmask lookup, then pinch check
+        return self.gesture_classifier.classify(landmarks)
+
+    def announce(self, name):
+        """Report the action being performed"""
+        print(f"Action: {name}")
+
+    def idle_action(self):
+        """Idle action - no specific action"""
+        pass
+
+    def stop_action(self):
+        """Stop action - pause media or stop current action"""
+        self.dispatcher.submit('stop', self.input.press, 'space')
+        self.announce("Stop")
+
+    def confirm_action(self):
+        """Confirm action - click or enter"""
+        self.dispatcher.submit('confirm', self.input.click)
+        self.announce("Confirm")
+
+    def play_action(self):
+        """Play action - start media or play"""
+        self.dispatcher.submit('play', self.input.press, 'space')
+        self.announce("Play")
+
+    def volume_up_action(self):
+        """Volume up action"""
+        self.dispatcher.submit('volume_up', self.input.press, 'volumeup')
+        self.announce("Volume Up")
+
+    def volume_down_action(self):
+        """Volume down action"""
+        self.dispatcher.submit('volume_down', self.input.press, 'volumedown')
+        self.announce("Volume Down")
+
+    def key_action(self, action, name):
+        """Press the key configured for an action in config.KEYBOARD_ACTIONS"""
+        self.dispatcher.submit(action, self.input.press, config.KEYBOARD_ACTIONS[action])
+        self.announce(name)
+
+    def combo_action(self, combo):
+        """Combo macro - press the combo's keys in order"""
+        for key in combo['keys']:
+            self.dispatcher.submit(combo['name'], self.input.press, key)
+        self.announce(combo['label'])
+
+    def drag_action(self):
+        """Drag action - announce the drag (the button is held by the hand's pinch drag)"""
+        self.announce("Drag")
+
+    def move_mouse_action(self, hand_pos, cursor_filter):
+        """Move mouse based on hand position, smoothed by the hand's cursor filter"""
+        if hand_pos:
+            # Map hand position to screen coordinates
+            screen_x = int(hand_pos[0] * self.screen_width)
+            screen_y = int(hand_pos[1] * self.screen_height)
+
+            # Smooth (and optionally predict ahead) with the configured cursor filter
+            screen_x, screen_y = cursor_filter.filter((screen_x, screen_y), self.frame_time)
+            screen_x, screen_y = int(screen_x), int(screen_y)
+
+            # Only the latest pending position is sent to the OS
+            self.dispatcher.submit('move_mouse', self.input.move_to, screen_x, screen_y, coalesce=True)
+            self.last_mouse_pos = (screen_x, screen_y)
+
+    def detect_hands(self, frame):
+        """Run MediaPipe hand detection on a BGR frame"""
+        # Quality changes from the latency governor are made on the inference thread
+        if self.pending_quality:
+            settings, self.pending_quality = self.pending_quality, None
+            self.apply_quality(settings)
+
+        # Static scenes without a hand reuse the last result
+        if self.motion_gate:
+            return self.motion_gate.process(frame, self.schedule_inference)
+        return self.schedule_inference(frame)
+
+    def schedule_inference(self, frame):
+        """Run inference, or extrapolate landmarks on skipped frames"""
+        # Skipped frames get landmarks extrapolated from recent detections
+        if self.inference_scheduler:
+            return self.inference_scheduler.process(frame, self.run_inference)
+        return self.run_inference(frame)
+
+    def run_inference(self, frame):
+        """Run MediaPipe on a BGR frame"""
+        # The latency governor may shrink the inference input (landmarks are normalized)
+        if self.inference_scale < 1.0:
+            frame = cv2.resize(frame, None, fx=self.inference_scale, fy=self.inference_scale,
+                               interpolation=cv2.INTER_AREA)
+
+        # Convert BGR to RGB
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+        # Process the frame (cropped to the tracked hand when ROI tracking is on)
+        if self.roi_tracker:
+            return self.roi_tracker.process(rgb_frame)
+        return self.hands.process(rgb_frame)
+
+    def track_hands(self, frame, results):
+        """Update every tracked hand from MediaPipe results; return the primary hand"""
+        # Match detections to tracked hands; hands that vanished are marked missing
+        matches = self.hand_tracker.update(results, self.frame_time)
+
+        # Idle mode only watches for motion or a hand; overlays are skipped while idle
+        if self.idle_monitor:
+            motion = self.motion_gate is not None and self.motion_gate.changed >= self.motion_gate.min_changed
+            self.idle_monitor.update(bool(matches), motion, self.frame_time)
+            # The capture size just changed; the background is rebuilt from new
+            # frames and the hand ROI (in old frame coordinates) is dropped
+            if self.idle_monitor.settling:
+                if self.motion_gate:
+                    self.motion_gate.reset()
+                if self.roi_tracker:
+                    self.roi_tracker.reset()
+        draw_overlays = self.draw_overlays and not self.is_idle()
+
+        for slot, (track, hand_landmarks) in enumerate(matches):
+            # Draw hand landmarks
+            if draw_overlays:
+                self.mp_drawing.draw_landmarks(
+                    frame,
+                    hand_landmarks,
+                    self.mp_hands.HAND_CONNECTIONS,
+                    self.mp_drawing_styles.get_default_hand_landmarks_style(),
+                    self.mp_drawing_styles.get_default_hand_connections_style()
+                )
+
+            # Convert once to a (21, 3) array shared by all consumers
+            raw_landmarks = self.landmark_buffer.fill(hand_landmarks, slot)
+
+            # Smooth over time so gestures don't flicker at finger-extension boundaries
+            track.landmarks = track.landmark_filter.filter(raw_landmarks, self.frame_time)
+
+            # Recognize gesture
+            track.gesture = self.recognize_gesture(track.landmarks)
+            track.pinch_distance = float(pinch_distance(track.landmarks))
+
+            # Get hand position (wrist); the cursor filter does its own smoothing
+            track.hand_pos = wrist_position(raw_landmarks)
+
+            # Trajectory-based gestures (swipe, circle, push/pull); a hand that is
+            # pointing or dragging moves the cursor, so its path is not a gesture
+            if track.motion_recognizer:
+                if track.gesture_state.current in CURSOR_GESTURES or track.pinch_drag.active:
+                    track.motion_recognizer.reset()
+                    track.motion_gesture = None
+                else:
+                    track.motion_gesture = track.motion_recognizer.update(track.landmarks, self.frame_time)
+
+            # Label the hand with its track id and role
+            if draw_overlays:
+                height, width = frame.shape[:2]
+                cv2.putText(frame, f"#{track.id} {track.handedness} ({track.role})",
+                           (int(track.hand_pos[0] * width), int(track.hand_pos[1] * height) + 25),
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
+
+        # The cursor hand (or the only hand) drives the overlay
+        return self.hand_tracker.primary()
+
+    def handle_gestures(self):
+        """Execute actions for every tracked hand once its gesture changes are confirmed"""
+        for track in self.hand_tracker.tracks:
+            self.handle_hand(track)
+        # Held actions whose combo timed out run even when no hand is left
+        if self.combo_matcher:
+            for gesture in self.combo_matcher.release(self.frame_time):
+                self.action_mappings[gesture]()
+
+    def handle_hand(self, track):
+        """Route one hand's confirmed gestures to the actions its role allows"""
+        state = track.gesture_state
+        confirmed = state.update(track.gesture, self.frame_time)
+        motion = track.motion_gesture
+
+        # Confirmed gestures of command hands advance the combo automaton; the
+        # action of a gesture that is part of a live combo prefix waits until
+        # the combo completes (dropped) or breaks off (run late)
+        combos = self.combo_matcher if track.role != 'cursor' else None
+        if combos:
+            combo = None
+            if state.transitioned and state.current:
+                combo = combos.feed(state.current, self.frame_time)
+            if motion:
+                combo = combos.feed(motion, self.frame_time) or combo
+            for gesture in combos.release(self.frame_time):
+                self.action_mappings[gesture]()
+            if combo:
+                self.combo_action(combo)
+
+        if confirmed and track.handles(confirmed):
+            self.last_gesture = confirmed
+            self.gesture_cooldown = time.time()
+
+            # Execute action (point moves the mouse below, every frame it is held)
+            if confirmed in self.action_mappings and confirmed != 'point' and \
+                    not (combos and combos.hold(confirmed, self.frame_time)):
+                self.action_mappings[confirmed]()
+
+        # Motion gestures are single events, already confirmed by their trajectory
+        if motion in self.action_mappings and track.handles(motion) and \
+                not (combos and combos.hold(motion, self.frame_time)):
+            self.action_mappings[motion]()
+
+        # Pinch drag: button down on a confirmed pinch, up once the fingers separate
+        if track.handles('pinch'):
+            track.pinch_drag.update(state.current == 'pinch', track.pinch_distance)
+        else:
+            track.pinch_drag.release()
+
+        # Move the mouse while point is the confirmed gesture or a drag is in progress
+        if (state.current == 'point' or track.pinch_drag.active) and track.hand_pos \
+                and track.handles('point'):
+            self.move_mouse_action(track.hand_pos, track.cursor_filter)
+
+    def close_hands(self):
+        """Print the idle, motion gate and QoS statistics and close MediaPipe"""
+        if self.idle_monitor:
+            stats = self.idle_monitor.get_stats()
+            print(f"Active: {stats['active_s']:.0f} s at {stats['active_cpu']:.0f}% CPU, "
+                  f"idle: {stats['idle_s']:.0f} s at {stats['idle_cpu']:.0f}% CPU "
+                  f"({stats['idle_entries']} idle periods)")
+        if self.motion_gate:
+            stats = self.motion_gate.get_stats()
+            print(f"Motion gate: skipped {stats['skipped']}/{stats['frames']} frames, "
+                  f"bypassed {stats['bypassed']} with a hand, "
+                  f"saved {stats['saved_s']:.1f} s, gate cost {stats['gate_ms']:.2f} ms/frame")
+        if self.qos:
+            stats = self.qos.get_stats()
+            print(f"QoS level: {stats['level']}, decisions: {stats['decisions']}")
+        if self.roi_tracker:
+            stats = self.roi_tracker.get_stats()
+            print(f"Hand ROI: {stats['roi_frames']} crop frames, {stats['full_frames']} full frames, "
+                  f"lost {stats['lost']}")
+            self.roi_tracker.crop_hands.close()
+        self.hands.close()
@@ -0,0 +1,116 @@
+"""
+Motion gestures
+Recognizes swipes, circles and push/pull from the recent trajectory of the
+hand. Wrist and index fingertip positions, hand size and the turning angle
+of the fingertip path are kept in fixed-size ring arrays; the turning angle
+is summed incrementally, so each frame costs a handful of small array
+operations. Detections are gesture names from config.GESTURE_ACTIONS.
+"""
+
+import math
+import time
+import numpy as np
+
+import config
+from landmarks import WRIST, INDEX_TIP
+
+MIDDLE_BASE = 9
+MIN_SEGMENT = 0.004  # Fingertip steps shorter than this (normalized) don't turn the path
+
+
+class MotionGestureRecognizer:
+    def __init__(self, window=None):
+        self.window = window or config.MOTION_WINDOW
+
+        # Ring arrays, row head is the next one written
+        self.wrist = np.zeros((self.window, 2), dtype=np.float32)
+        self.tip = np.zeros((self.window, 2), dtype=np.float32)
+        self.scale = np.zeros(self.window, dtype=np.float32)
+        self.times = np.zeros(self.window, dtype=np.float64)
+        self.turns = np.zeros(self.window, dtype=np.float64)
+        self.head = 0
+        self.count = 0
+        self.turn_sum = 0.0
+        self.last_detection = -math.inf
+
+        # Statistics
+        self.detections = {}
+
+    def reset(self):
+        self.head = 0
+        self.count = 0
+        self.turn_sum = 0.0
+        self.turns.fill(0)
+
+    def update(self, landmarks, timestamp=None):
+        """Add this frame's (21, 3) landmarks; return a motion gesture name or None"""
+        timestamp = time.time() if timestamp is None else timestamp
+        i = self.head
+        self.wrist[i] = landmarks[WRIST, :2]
+        self.tip[i] = landmarks[INDEX_TIP, :2]
+        self.scale[i] = math.hypot(*(landmarks[MIDDLE_BASE, :2] - landmarks[WRIST, :2]).tolist())
+        self.times[i] = timestamp
+
+        # Signed turn of the fingertip path at the previous sample; the sum
+        # over the window is kept up to date by removing the overwritten turn
+        turn = 0.0
+        if self.count >= 2:
+            prev = (i - 1) % self.window
+            before = (i - 2) % self.window
+            ax, ay = (self.tip[prev] - self.tip[before]).tolist()
+            bx, by = (self.tip[i] - self.tip[prev]).tolist()
+            if math.hypot(ax, ay) > MIN_SEGMENT and math.hypot(bx, by) > MIN_SEGMENT:
+                turn = math.atan2(ax * by - ay * bx, ax * bx + ay * by)
+        self.turn_sum += turn - self.turns[i]
+        self.turns[i] = turn
+
+        self.head = (i + 1) % self.window
+        self.count = min(self.count + 1, self.window)
+
+        if timestamp - self.last_detection < config.MOTION_COOLDOWN or self.count < 3:
+            return None
+
+        gesture = self._detect(i, timestamp)
+        if gesture:
+            self.last_detection = timestamp
+            self.detections[gesture] = self.detections.get(gesture, 0) + 1
+            self.reset()
+        return gesture
+
+    def _detect(self, newest, timestamp):
+        oldest = (newest - self.count + 1) % self.window
+
+        # Push/pull: the hand grows or shrinks while staying in place
+        wrist_shift = self.wrist[newest] - self.wrist[oldest]
+        ratio = self.scale[newest] / max(self.scale[oldest], 1e-6)
+        if math.hypot(*wrist_shift.tolist()) < config.MOTION_SWIPE_DISTANCE:
+            if ratio > config.MOTION_PUSH_SCALE_RATIO:
+                return 'push'
+            if ratio < 1.0 / config.MOTION_PUSH_SCALE_RATIO:
+                return 'pull'
+
+        # Circle: the fingertip path turned (almost) all the way round
+        if abs(self.turn_sum) >= 2 * math.pi * config.MOTION_CIRCLE_TURNS:
+            index = np.arange(self.count) + oldest
+            extent = np.ptp(self.tip[index % self.window], axis=0)
+            if extent.min() >= config.MOTION_CIRCLE_MIN_SIZE:
+                return 'circle'
+
+        # Swipe: fast, mostly straight wrist movement within MOTION_SWIPE_TIME
+        start = newest
+        for _ in range(self.count - 1):
+            previous = (start - 1) % self.window
+            if timestamp - self.times[previous] > config.MOTION_SWIPE_TIME:
+                break
+            start = previous
+        dx, dy = (self.wrist[newest] - self.wrist[start]).tolist()
+        if config.MOTION_MIRROR_X:
+            dx = -dx
+        if abs(dx) >= config.MOTION_SWIPE_DISTANCE and abs(dx) >= config.MOTION_SWIPE_AXIS_RATIO * abs(dy):
+            return 'swipe_right' if dx > 0 else 'swipe_left'
+        if abs(dy) >= config.MOTION_SWIPE_DISTANCE and abs(dy) >= config.MOTION_SWIPE_AXIS_RATIO * abs(dx):
+            return 'swipe_down' if dy > 0 else 'swipe_up'
+        return None
+
+    def get_stats(self):
+        return dict(self.detections)
@@ -0,0 +1,56 @@
+"""
+Pinch drag
+Turns the pinch gesture into a continuous drag: the mouse button goes down
+when a pinch is confirmed, the cursor keeps following the hand, and the
+button is released once the thumb and index tips clearly separate. The
+release distance is larger than the press distance so a borderline pinch
+does not produce a storm of press/release events.
+"""
+
+import config
+
+
+class PinchDrag:
+    def __init__(self, dispatcher, input_backend, press_threshold=None, release_threshold=None):
+        self.dispatcher = dispatcher
+        self.input = input_backend
+        self.press_threshold = press_threshold or config.PINCH_DISTANCE_THRESHOLD
+        self.release_threshold = max(release_threshold or config.PINCH_RELEASE_THRESHOLD,
+                                     self.press_threshold)
+
+        self.active = False
+
+        # Statistics
+        self.drags = 0
+
+    def update(self, pinch_confirmed, distance=None):
+        """Advance the drag state for this frame; return 'press', 'release' or None
+
+        pinch_confirmed is whether the debounced gesture is the pinch,
+        distance the thumb-index distance (None while the hand is lost).
+        """
+        if not self.active:
+            if pinch_confirmed and distance is not None and distance < self.press_threshold:
+                self.press()
+                return 'press'
+            return None
+
+        if distance is not None:
+            released = distance > self.release_threshold
+        else:
+            released = not pinch_confirmed
+        if released:
+            self.release()
+            return 'release'
+        return None
+
+    def press(self):
+        self.active = True
+        self.drags += 1
+        self.dispatcher.submit('drag_press', self.input.mouse_down, paired=True)
+
+    def release(self):
+        """Release the button if a drag is in progress"""
+        if self.active:
+            self.active = False
+            self.dispatcher.submit('drag_release', self.input.mouse_up, paired=True)
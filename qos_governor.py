@@ -0,0 +1,107 @@
+"""
+Latency governor
+Measures end-to-end frame latency (capture to display) and steps through
+the quality levels in config.QOS_LEVELS to hold a latency percentile under
+the target: overlays off, lighter model, smaller inference input, more
+frame skipping. Quality only comes back after latency has stayed well under
+the target for a while, so the governor does not oscillate. Every decision
+is logged.
+"""
+
+import time
+import numpy as np
+
+import config
+
+
+def default_quality():
+    """Quality settings configured in config.py (level 0)"""
+    return {
+        'draw_overlays': config.DRAW_HAND_LANDMARKS,
+        'model_complexity': config.MEDIAPIPE_MODEL_COMPLEXITY,
+        'inference_scale': 1.0,
+        'max_skip': config.INFERENCE_SKIP_MAX_FRAMES
+    }
+
+
+class LatencyGovernor:
+    def __init__(self, apply, levels=None, target=None, percentile=None, window=None,
+                 upgrade_margin=None, upgrade_hold=None):
+        """apply(settings) is called with the full settings dict on every change"""
+        self.apply = apply
+        self.target = target or config.QOS_LATENCY_TARGET
+        self.percentile = percentile or config.QOS_PERCENTILE
+        self.upgrade_margin = upgrade_margin or config.QOS_UPGRADE_MARGIN
+        self.upgrade_hold = config.QOS_UPGRADE_HOLD if upgrade_hold is None else upgrade_hold
+        self.hold = self.upgrade_hold  # grows when an upgrade has to be undone
+
+        # Each level overrides the configured defaults
+        defaults = default_quality()
+        self.levels = [dict(defaults, **overrides) for overrides in (levels or config.QOS_LEVELS)]
+        self.level = 0
+
+        # Latencies (seconds) since the last decision, as a ring array
+        self.samples = np.zeros(window or config.QOS_WINDOW, dtype=np.float64)
+        self.count = 0
+        self.last_change = time.time()
+        self.last_percentile = 0.0
+
+        # Statistics
+        self.decisions = []  # (time, old level, new level, measured percentile)
+
+    @property
+    def settings(self):
+        return self.levels[self.level]
+
+    def record(self, latency):
+        """Add one frame's end-to-end latency (seconds); may change the level"""
+        self.samples[self.count % len(self.samples)] = latency
+        self.count += 1
+        if self.count < len(self.samples):
+            return
+
+        # Decide once per full window of samples taken at the current level
+        self.last_percentile = float(np.percentile(self.samples, self.percentile))
+        self.count = 0
+        now = time.time()
+
+        if self.last_percentile > self.target:
+            self._change(self._next_level(+1), now, "over")
+        elif self.last_percentile < self.target * self.upgrade_margin and \
+                now - self.last_change >= self.hold:
+            self._change(self._next_level(-1), now, "under")
+
+    def _next_level(self, step):
+        """Nearest level in the given direction whose settings actually differ"""
+        level = self.level + step
+        while 0 <= level < len(self.levels):
+            if self.levels[level] != self.settings:
+                return level
+            level += step
+        return self.level
+
+    def _change(self, level, now, reason):
+        if level == self.level:
+            return
+        old = self.level
+        # An upgrade that had to be undone quickly waits twice as long next time
+        if level > old and self.decisions and self.decisions[-1][2] < self.decisions[-1][1] \
+                and now - self.last_change < 2 * self.hold:
+            self.hold = min(2 * self.hold, 8 * self.upgrade_hold)
+        self.level = level
+        self.last_change = now
+        self.decisions.append((now, old, level, self.last_percentile))
+
+        changed = {key: value for key, value in self.settings.items()
+                   if self.levels[old].get(key) != value}
+        print(f"QoS: p{self.percentile} latency {self.last_percentile * 1000:.0f} ms {reason} "
+              f"target {self.target * 1000:.0f} ms, level {old} -> {level} {changed}")
+        self.apply(dict(self.settings))
+
+    def get_stats(self):
+        return {
+            'level': self.level,
+            'percentile_ms': self.last_percentile * 1000,
+            'upgrade_hold': self.hold,
+            'decisions': len(self.decisions)
+        }
@@ -1,221 +1,99 @@
 import cv2
 import mediapipe as mp
-import numpy as np
-import pyautogui
 import time
-import math
-from collections import deque
+import config
+from frame_capture import open_camera
+from action_dispatcher import ActionDispatcher
+from input_backends import create_input_backend
+from combo_matcher import ComboMatcher
+from hand_tracks import HandTracker
+from qos_governor import LatencyGovernor
+from inference_scheduler import AdaptiveInferenceScheduler
+from motion_gate import MotionGate
+from idle_mode import IdleMonitor
+from landmarks import LandmarkBuffer
+from gesture_classifier import GestureClassifier
+from mediapipe_controller import MediaPipeControllerMixin
 
-class SimpleHandGestureController:
-    def __init__(self):
+class SimpleHandGestureController(MediaPipeControllerMixin):
+    def __init__(self, frame_source=None):
         # Initialize MediaPipe
         self.mp_hands = mp.solutions.hands
         self.mp_drawing = mp.solutions.drawing_utils
         self.mp_drawing_styles = mp.solutions.drawing_styles
         
         # Initialize hands detection
-        self.hands = self.mp_hands.Hands(
-            model_complexity=1,
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.5,
-            max_num_hands=1
-        )
+        self.model_complexity = config.MEDIAPIPE_MODEL_COMPLEXITY
+        self.hands = self.create_hands()
         
-        # Initialize camera
-        self.cap = cv2.VideoCapture(0)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
+        # Optionally run MediaPipe on a crop around the last hand position
+        self.roi_tracker = self.create_roi_tracker()
         
-        # Screen dimensions
-        self.screen_width, self.screen_height = pyautogui.size()
+        # Skip inference on some frames and extrapolate landmarks instead
+        self.inference_scheduler = AdaptiveInferenceScheduler() if config.INFERENCE_SKIP_ENABLED else None
         
-        # Gesture tracking
-        self.last_gesture = None
-        self.gesture_cooldown = 0
-        self.cooldown_time = 1.0  # seconds
+        # Reuse the last empty result while nothing moves in front of the camera
+        self.motion_gate = MotionGate() if config.MOTION_GATE_ENABLED else None
         
-        # Mouse control
-        self.mouse_sensitivity = 2.0
-        self.last_mouse_pos = None
-        
-        # Gesture definitions
-        self.gestures = {
-            'open_palm': 'Idle',
-            'fist': 'Stop',
-            'thumbs_up': 'Confirm',
-            'two_fingers': 'Play',
-            'three_fingers': 'Volume Up',
-            'four_fingers': 'Volume Down',
-            'pinch': 'Drag',
-            'point': 'Move Mouse'
-        }
+        # Overlay drawing and inference input scale, lowered by the latency governor
+        self.draw_overlays = config.DRAW_HAND_LANDMARKS
+        self.inference_scale = 1.0
+        self.pending_quality = None
+        self.qos = LatencyGovernor(self.request_quality) if config.QOS_ENABLED else None
         
-        # Action mappings
-        self.action_mappings = {
-            'open_palm': self.idle_action,
-            'fist': self.stop_action,
-            'thumbs_up': self.confirm_action,
-            'two_fingers': self.play_action,
-            'three_fingers': self.volume_up_action,
-            'four_fingers': self.volume_down_action,
-            'pinch': self.drag_action,
-            'point': self.move_mouse_action
-        }
-    
-    def calculate_distance(self, point1, point2):
-        """Calculate Euclidean distance between two points"""
-        return math.sqrt((point1[0] - point2[0])**2 + (point1[1] - point2[1])**2)
-    
-    def get_finger_tips(self, hand_landmarks):
-        """Extract finger tip coordinates"""
-        tips = []
-        tip_ids = [4, 8, 12, 16, 20]  # thumb, index, middle, ring, pinky
+        # Landmark arrays (one slot per hand) reused from frame to frame
+        self.landmark_buffer = LandmarkBuffer(config.MEDIAPIPE_MAX_NUM_HANDS)
         
-        for tip_id in tip_ids:
-            tip = hand_landmarks.landmark[tip_id]
-            tips.append((tip.x, tip.y))
+        # Gesture lookup table generated from config.GESTURE_ACTIONS
+        self.gesture_classifier = GestureClassifier()
         
-        return tips
-    
-    def get_finger_bases(self, hand_landmarks):
-        """Extract finger base coordinates"""
-        bases = []
-        base_ids = [2, 5, 9, 13, 17]  # thumb, index, middle, ring, pinky
+        # Initialize camera (frames are read on a background thread)
+        # unless a file/synthetic frame source is given
+        self.cap = frame_source if frame_source is not None else open_camera()
         
-        for base_id in base_ids:
-            base = hand_landmarks.landmark[base_id]
-            bases.append((base.x, base.y))
+        # Low-power capture while nobody is in front of the camera
+        self.idle_monitor = IdleMonitor(self.cap) if config.IDLE_MODE_ENABLED else None
         
-        return bases
-    
-    def is_finger_extended(self, tip, base, palm_center):
-        """Check if a finger is extended"""
-        tip_to_palm = self.calculate_distance(tip, palm_center)
-        base_to_palm = self.calculate_distance(base, palm_center)
-        return tip_to_palm > base_to_palm * 1.2
-    
-    def recognize_gesture(self, hand_landmarks):
-        """Recognize hand gesture based on finger positions"""
-        if not hand_landmarks:
-            return None
+        # Input injection backend (pyautogui, XTest or in-memory recording)
+        self.input = create_input_backend()
+        print(f"Input backend: {self.input.name}")
         
-        # Get finger tips and bases
-        tips = self.get_finger_tips(hand_landmarks)
-        bases = self.get_finger_bases(hand_landmarks)
+        # Screen dimensions
+        self.screen_width, self.screen_height = self.input.screen_size()
         
-        # Get palm center (wrist)
-        wrist = hand_landmarks.landmark[0]
-        palm_center = (wrist.x, wrist.y)
+        # OS input injection runs on its own thread
+        self.dispatcher = ActionDispatcher()
         
-        # Check finger extensions
-        extended_fingers = []
-        for i, (tip, base) in enumerate(zip(tips, bases)):
-            if self.is_finger_extended(tip, base, palm_center):
-                extended_fingers.append(i)
+        # Hands keep stable track ids; each has its own gesture state, landmark
+        # and cursor filters, motion recognizer and pinch drag
+        self.hand_tracker = HandTracker(self.dispatcher, self.input)
         
-        # Gesture recognition logic
-        if len(extended_fingers) == 5:
-            return 'open_palm'
-        elif len(extended_fingers) == 0:
-            return 'fist'
-        elif len(extended_fingers) == 1 and 0 in extended_fingers:  # thumb only
-            return 'thumbs_up'
-        elif len(extended_fingers) == 2 and 1 in extended_fingers and 2 in extended_fingers:
-            return 'two_fingers'
-        elif len(extended_fingers) == 3 and 1 in extended_fingers and 2 in extended_fingers and 3 in extended_fingers:
-            return 'three_fingers'
-        elif len(extended_fingers) == 4 and 1 in extended_fingers and 2 in extended_fingers and 3 in extended_fingers and 4 in extended_fingers:
-            return 'four_fingers'
-        elif len(extended_fingers) == 1 and 1 in extended_fingers:  # index finger only
-            return 'point'
+        # Gesture tracking (actions fire only on debounced transitions)
+        self.combo_matcher = ComboMatcher() if config.GESTURE_COMBOS_ENABLED else None
+        self.last_gesture = None
+        self.gesture_cooldown = 0
+        self.cooldown_time = config.GESTURE_COOLDOWN_TIME
         
-        # Check for pinch gesture (thumb and index finger close)
-        thumb_tip = tips[0]
-        index_tip = tips[1]
-        if self.calculate_distance(thumb_tip, index_tip) < 0.05:
-            return 'pinch'
+        # Mouse control
+        self.mouse_sensitivity = 2.0
+        self.last_mouse_pos = None
+        self.frame_time = None  # capture time of the frame being processed
         
-        return None
-    
-    def idle_action(self):
-        """Idle action - no specific action"""
-        pass
-    
-    def stop_action(self):
-        """Stop action - pause media or stop current action"""
-        pyautogui.press('space')
-        print("Action: Stop")
-    
-    def confirm_action(self):
-        """Confirm action - click or enter"""
-        pyautogui.click()
-        print("Action: Confirm")
-    
-    def play_action(self):
-        """Play action - start media or play"""
-        pyautogui.press('space')
-        print("Action: Play")
-    
-    def volume_up_action(self):
-        """Volume up action"""
-        pyautogui.press('volumeup')
-        print("Action: Volume Up")
-    
-    def volume_down_action(self):
-        """Volume down action"""
-        pyautogui.press('volumedown')
-        print("Action: Volume Down")
-    
-    def drag_action(self):
-        """Drag action - hold mouse button"""
-        pyautogui.mouseDown()
-        time.sleep(0.1)
-        pyautogui.mouseUp()
-        print("Action: Drag")
-    
-    def move_mouse_action(self, hand_pos):
-        """Move mouse based on hand position"""
-        if hand_pos:
-            # Map hand position to screen coordinates
-            screen_x = int(hand_pos[0] * self.screen_width)
-            screen_y = int(hand_pos[1] * self.screen_height)
-            
-            # Apply smoothing
-            if self.last_mouse_pos:
-                screen_x = int(0.7 * screen_x + 0.3 * self.last_mouse_pos[0])
-                screen_y = int(0.7 * screen_y + 0.3 * self.last_mouse_pos[1])
-            
-            pyautogui.moveTo(screen_x, screen_y)
-            self.last_mouse_pos = (screen_x, screen_y)
+        # Gesture definitions and action mappings
+        self.init_actions()
     
     def process_frame(self, frame):
         """Process a single frame and detect gestures"""
-        # Convert BGR to RGB
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
-        # Process the frame
-        results = self.hands.process(rgb_frame)
+        results = self.detect_hands(frame)
         
         gesture = None
         hand_pos = None
         
-        if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                # Draw hand landmarks
-                self.mp_drawing.draw_landmarks(
-                    frame,
-                    hand_landmarks,
-                    self.mp_hands.HAND_CONNECTIONS,
-                    self.mp_drawing_styles.get_default_hand_landmarks_style(),
-                    self.mp_drawing_styles.get_default_hand_connections_style()
-                )
-                
-                # Recognize gesture
-                gesture = self.recognize_gesture(hand_landmarks)
-                
-                # Get hand position (wrist)
-                wrist = hand_landmarks.landmark[0]
-                hand_pos = (wrist.x, wrist.y)
+        # The cursor hand (or the only hand) drives the overlay
+        primary = self.track_hands(frame, results)
+        if primary:
+            gesture = primary.gesture
+            hand_pos = primary.hand_pos
         
         return frame, gesture, hand_pos
     
@@ -235,38 +113,38 @@ class SimpleHandGestureController:
         
         try:
             while True:
-                ret, frame = self.cap.read()
+                ret, frame, frame_time = self.read_frame()
                 if not ret:
                     break
                 
+                self.frame_time = frame_time
+                
                 # Process frame
                 frame, gesture, hand_pos = self.process_frame(frame)
                 
                 # Handle gestures
-                if gesture and gesture != self.last_gesture:
-                    self.last_gesture = gesture
-                    self.gesture_cooldown = time.time()
-                    
-                    # Execute action
-                    if gesture in self.action_mappings:
-                        if gesture == 'point':
-                            self.action_mappings[gesture](hand_pos)
-                        else:
-                            self.action_mappings[gesture]()
+                self.handle_gestures()
                 
-                # Handle mouse movement for point gesture
-                if gesture == 'point' and hand_pos:
-                    self.move_mouse_action(hand_pos)
-                
-                # Display gesture info on camera frame
-                if gesture:
-                    cv2.putText(frame, f"Gesture: {self.gestures.get(gesture, 'Unknown')}", 
-                              (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-                    cv2.putText(frame, f"Action: {self.gestures.get(gesture, 'None')}", 
-                              (10, 70), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2)
-                
-                # Display frame
-                cv2.imshow('Simple Hand Gesture Controller', frame)
+                # While idle the window keeps its last picture; only input is handled
+                if not self.is_idle():
+                    # Display gesture info on camera frame
+                    if gesture:
+                        cv2.putText(frame, f"Gesture: {self.gestures.get(gesture, 'Unknown')}", 
+                                  (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+                        cv2.putText(frame, f"Action: {self.gestures.get(gesture, 'None')}", 
+                                  (10, 70), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2)
+                    
+                    # Show capture-to-display latency (and feed it to the latency governor)
+                    latency_ms = (time.time() - frame_time) * 1000
+                    latency_text = f"Latency: {latency_ms:.0f} ms"
+                    if self.qos:
+                        self.qos.record(latency_ms / 1000)
+                        latency_text += f" (QoS level {self.qos.level})"
+                    cv2.putText(frame, latency_text, (10, frame.shape[0] - 20), 
+                               cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+                    
+                    # Display frame
+                    cv2.imshow('Simple Hand Gesture Controller', frame)
                 
                 # Check for quit
                 if cv2.waitKey(1) & 0xFF == ord('q'):
@@ -277,9 +155,14 @@ class SimpleHandGestureController:
     
     def cleanup(self):
         """Clean up resources"""
+        self.hand_tracker.close()
+        self.dispatcher.stop()
+        stats = self.cap.get_stats()
+        print(f"Frames captured: {stats['captured']}, processed: {stats['delivered']}, "
+              f"dropped: {stats['dropped']}")
         self.cap.release()
         cv2.destroyAllWindows()
-        self.hands.close()
+        self.close_hands()
 
 if __name__ == "__main__":
     controller = SimpleHandGestureController()
@@ -0,0 +1,91 @@
+"""
+Pre-rendered speech clips
+Renders each announcement to a WAV file once with pyttsx3 and keeps it in a
+local cache directory keyed by phrase, rate and voice. Later announcements
+are played through a pygame mixer channel without any synthesis.
+"""
+
+import os
+import hashlib
+import pygame
+
+import config
+
+
+class SpeechClipCache:
+    def __init__(self, cache_dir=None, rate=None):
+        self.cache_dir = cache_dir or config.TTS_CACHE_DIR or os.path.join(
+            os.path.expanduser('~'), '.cache', 'hand_gesture_controller', 'speech')
+        self.rate = rate or config.TTS_RATE
+        self.voice = None
+
+        # Loaded clips by phrase, and phrases that could not be rendered
+        self.sounds = {}
+        self.failed = set()
+        self.channel = None
+        self.available = self._init_mixer()
+
+        # Statistics
+        self.hits = 0
+        self.rendered = 0
+
+    def _init_mixer(self):
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            # One dedicated channel: a new announcement replaces the current one
+            self.channel = pygame.mixer.Channel(0)
+            os.makedirs(self.cache_dir, exist_ok=True)
+            return True
+        except Exception as e:
+            print(f"Speech clip cache unavailable: {e}")
+            return False
+
+    def attach(self, engine):
+        """Use the voice of the engine that renders the clips in cache keys"""
+        try:
+            self.voice = engine.getProperty('voice')
+        except Exception:
+            self.voice = None
+
+    def clip_path(self, phrase):
+        key = hashlib.sha1(f"{phrase}|{self.rate}|{self.voice}".encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.wav")
+
+    def play(self, phrase):
+        """Play a loaded clip, return False if the phrase has no clip yet"""
+        sound = self.sounds.get(phrase)
+        if sound is None:
+            return False
+        self.channel.play(sound)
+        self.hits += 1
+        return True
+
+    def prepare(self, engine, phrase):
+        """Load the phrase's clip, rendering it first if it is not on disk
+
+        Must be called from the thread that owns the pyttsx3 engine.
+        """
+        if not self.available or phrase in self.sounds or phrase in self.failed:
+            return phrase in self.sounds
+
+        path = self.clip_path(phrase)
+        try:
+            if not os.path.exists(path) or os.path.getsize(path) == 0:
+                engine.save_to_file(phrase, path)
+                engine.runAndWait()
+                self.rendered += 1
+
+            self.sounds[phrase] = pygame.mixer.Sound(path)
+            return True
+        except Exception as e:
+            print(f"Could not cache speech clip for '{phrase}': {e}")
+            self.failed.add(phrase)
+            return False
+
+    def get_stats(self):
+        return {
+            'clips': len(self.sounds),
+            'hits': self.hits,
+            'rendered': self.rendered
+        }
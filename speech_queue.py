@@ -0,0 +1,134 @@
+"""
+Asynchronous text-to-speech
+Speaks announcements with pyttsx3 on a worker thread so the vision loop never
+waits for runAndWait. When several announcements queue up only the latest
+one is spoken; announcements that waited too long are dropped. Phrases with
+a cached clip are played straight away.
+"""
+
+import time
+import threading
+from collections import deque
+
+import config
+from speech_cache import SpeechClipCache
+
+
+class SpeechQueue:
+    def __init__(self, rate=None, volume=None, max_pending=None, max_age=None):
+        self.rate = rate or config.TTS_RATE
+        self.volume = config.TTS_VOLUME if volume is None else volume
+        self.max_age = max_age or config.TTS_MAX_AGE
+
+        # Pre-rendered clips make repeated announcements instant
+        self.clip_cache = SpeechClipCache(rate=self.rate) if config.TTS_CLIP_CACHE_ENABLED else None
+        if self.clip_cache and not self.clip_cache.available:
+            self.clip_cache = None
+
+        # Pending (text, submit time), newest on the right
+        self.pending = deque(maxlen=max_pending or config.TTS_QUEUE_SIZE)
+        self.condition = threading.Condition()
+
+        # Statistics
+        self.spoken = 0
+        self.merged = 0
+        self.expired = 0
+
+        self.running = True
+        self.thread = threading.Thread(target=self._worker, daemon=True)
+        self.thread.start()
+
+    def say(self, text):
+        """Queue an announcement; never blocks the caller"""
+        # Cached clips play immediately without touching the TTS engine
+        if self.clip_cache and self.clip_cache.play(text):
+            self.spoken += 1
+            return
+
+        with self.condition:
+            # Repeating the newest pending phrase adds nothing
+            if self.pending and self.pending[-1][0] == text:
+                self.merged += 1
+                return
+            if len(self.pending) == self.pending.maxlen:
+                self.merged += 1
+            self.pending.append((text, time.time()))
+            self.condition.notify()
+
+    def _create_engine(self):
+        # pyttsx3 engines must be used from the thread that created them
+        import pyttsx3
+        engine = pyttsx3.init()
+        engine.setProperty('rate', self.rate)
+        engine.setProperty('volume', self.volume)
+        return engine
+
+    def _worker(self):
+        try:
+            engine = self._create_engine()
+        except Exception as e:
+            print(f"Text-to-speech unavailable: {e}")
+            return
+
+        # Render the known announcements up front
+        if self.clip_cache:
+            self.clip_cache.attach(engine)
+            for phrase in config.TTS_PRERENDER_PHRASES:
+                if not self.running:
+                    break
+                self.clip_cache.prepare(engine, phrase)
+
+        while True:
+            with self.condition:
+                while self.running and not self.pending:
+                    self.condition.wait()
+                if not self.running:
+                    break
+
+                # Only the latest announcement is still relevant
+                text, submitted = self.pending.pop()
+                self.merged += len(self.pending)
+                self.pending.clear()
+
+            if time.time() - submitted > self.max_age:
+                self.expired += 1
+                continue
+
+            self._speak(engine, text)
+
+        try:
+            engine.stop()
+        except Exception:
+            pass
+
+    def _speak(self, engine, text):
+        # First use of a phrase renders its clip for next time
+        if self.clip_cache and self.clip_cache.prepare(engine, text):
+            self.clip_cache.play(text)
+            self.spoken += 1
+            return
+
+        try:
+            engine.say(text)
+            engine.runAndWait()
+            self.spoken += 1
+        except Exception:
+            pass  # Ignore TTS errors
+
+    def get_stats(self):
+        with self.condition:
+            stats = {
+                'spoken': self.spoken,
+                'merged': self.merged,
+                'expired': self.expired
+            }
+        if self.clip_cache:
+            stats.update(self.clip_cache.get_stats())
+        return stats
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.pending.clear()
+            self.condition.notify_all()
+        self.thread.join(timeout=1.0)
@@ -6,35 +6,50 @@ A simplified but functional hand gesture recognition system
 
 import cv2
 import numpy as np
-import pyautogui
 import time
 import math
 from collections import deque
+import config
+from frame_capture import open_camera
+from action_dispatcher import ActionDispatcher
+from input_backends import create_input_backend
+from cursor_filters import create_cursor_filter
+from gesture_state import GestureStateMachine
+from combo_matcher import ComboMatcher
+from skin_segmenter import SkinSegmenter, AdaptiveSkinSegmenter
+from contour_analysis import analyze_hand_contour, gesture_from_fingers
 
 class WorkingHandGestureController:
-    def __init__(self):
+    def __init__(self, frame_source=None):
         # Initialize camera with better error handling
-        self.cap = cv2.VideoCapture(0)
+        # (frames are read on a background thread unless a frame source is given)
+        self.cap = frame_source if frame_source is not None else open_camera()
         if not self.cap.isOpened():
             print("❌ Error: Could not open camera")
             return
         
-        # Set camera properties
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-        self.cap.set(cv2.CAP_PROP_FPS, 30)
+        # Input injection backend (pyautogui, XTest or in-memory recording)
+        self.input = create_input_backend()
+        print(f"Input backend: {self.input.name}")
         
         # Screen dimensions
-        self.screen_width, self.screen_height = pyautogui.size()
+        self.screen_width, self.screen_height = self.input.screen_size()
         
-        # Gesture tracking
+        # OS input injection runs on its own thread
+        self.dispatcher = ActionDispatcher()
+        
+        # Gesture tracking (actions fire only on debounced transitions)
+        self.gesture_state = GestureStateMachine()
+        self.combo_matcher = ComboMatcher() if config.GESTURE_COMBOS_ENABLED else None
         self.last_gesture = None
         self.gesture_cooldown = 0
-        self.cooldown_time = 1.0  # seconds
+        self.cooldown_time = config.GESTURE_COOLDOWN_TIME
         
         # Mouse control
         self.mouse_sensitivity = 2.0
         self.last_mouse_pos = None
+        self.cursor_filter = create_cursor_filter()
+        self.frame_time = None  # capture time of the frame being processed
         
         # Gesture definitions
         self.gestures = {
@@ -44,7 +59,6 @@ class WorkingHandGestureController:
             'two_fingers': 'Play',
             'three_fingers': 'Volume Up',
             'four_fingers': 'Volume Down',
-            'pinch': 'Drag',
             'point': 'Move Mouse'
         }
         
@@ -56,7 +70,6 @@ class WorkingHandGestureController:
             'two_fingers': self.play_action,
             'three_fingers': self.volume_up_action,
             'four_fingers': self.volume_down_action,
-            'pinch': self.drag_action,
             'point': self.move_mouse_action
         }
         
@@ -64,72 +77,54 @@ class WorkingHandGestureController:
         self.lower_skin = np.array([0, 20, 70], dtype=np.uint8)
         self.upper_skin = np.array([20, 255, 255], dtype=np.uint8)
         
+        # Adaptive skin histogram (seeded from the HSV range above or a saved
+        # calibration), or a lookup table built once from the fixed range
+        if config.SKIN_MODEL_ADAPTIVE:
+            self.skin_segmenter = AdaptiveSkinSegmenter(self.lower_skin, self.upper_skin)
+        else:
+            self.skin_segmenter = SkinSegmenter(self.lower_skin, self.upper_skin)
+        
         print("✅ Hand Gesture Controller initialized successfully!")
     
     def detect_hand_simple(self, frame):
         """Simple hand detection using color-based segmentation"""
         try:
-            # Convert to HSV
-            hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+            # Skin mask from the skin model (possibly downscaled); contours come
+            # back in full-frame coordinates
+            contours = self.skin_segmenter.find_contours(frame)
             
-            # Create mask for skin color
-            mask = cv2.inRange(hsv, self.lower_skin, self.upper_skin)
+            # Area, bounding box, hull and convexity defects of the largest contour, once each
+            hand = analyze_hand_contour(contours, min_area=1000)
+            if hand is None:
+                return None, 0, None
             
-            # Apply morphological operations
-            kernel = np.ones((3, 3), np.uint8)
-            mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
-            mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
+            # Keep the adaptive skin model in step with the lighting, learning only
+            # from contours with separated fingers (not a face, arm or background)
+            if config.SKIN_MODEL_ADAPTIVE and hand['fingers'] >= config.SKIN_LEARN_MIN_FINGERS:
+                self.skin_segmenter.learn(hand['contour'])
             
-            # Find contours
-            contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            x, y, w, h = hand['bbox']
+            hand_center = hand['center']
             
-            if contours:
-                # Find the largest contour (likely the hand)
-                largest_contour = max(contours, key=cv2.contourArea)
-                
-                # Filter by minimum area
-                if cv2.contourArea(largest_contour) < 1000:
-                    return None, 0, None
-                
-                # Get bounding rectangle
-                x, y, w, h = cv2.boundingRect(largest_contour)
-                
-                # Calculate hand center
-                hand_center = (x + w//2, y + h//2)
-                
-                # Calculate hand area for gesture estimation
-                area = cv2.contourArea(largest_contour)
-                
-                # Draw rectangle around hand
-                cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
-                cv2.circle(frame, hand_center, 5, (0, 0, 255), -1)
-                
-                return hand_center, area, largest_contour
-            else:
-                return None, 0, None
+            # Draw rectangle around hand, its hull and the gaps between fingers
+            cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+            cv2.circle(frame, hand_center, 5, (0, 0, 255), -1)
+            cv2.polylines(frame, [hand['hull']], True, (255, 0, 0), 2)
+            for gap in hand['gaps'].tolist():
+                cv2.circle(frame, tuple(gap), 5, (255, 0, 255), -1)
+            
+            return hand_center, hand['area'], hand
         except Exception as e:
             print(f"Error in hand detection: {e}")
             return None, 0, None
     
-    def estimate_gesture_simple(self, hand_center, area, contour):
-        """Simple gesture estimation based on hand area and position"""
+    def estimate_gesture_simple(self, hand_center, area, hand):
+        """Gesture from the number of fingers counted on the hand contour"""
         if hand_center is None:
             return None
         
-        # Normalize area (this is a very rough estimation)
-        normalized_area = area / 10000  # Adjust this threshold based on testing
-        
-        # Simple gesture classification based on area
-        if normalized_area > 2.0:
-            return 'open_palm'
-        elif normalized_area > 1.5:
-            return 'two_fingers'
-        elif normalized_area > 1.0:
-            return 'three_fingers'
-        elif normalized_area > 0.5:
-            return 'point'
-        else:
-            return 'fist'
+        # Fingers come from convexity defects, so the distance to the camera doesn't matter
+        return gesture_from_fingers(hand['fingers'])
     
     def idle_action(self):
         """Idle action - no specific action"""
@@ -137,35 +132,34 @@ class WorkingHandGestureController:
     
     def stop_action(self):
         """Stop action - pause media or stop current action"""
-        pyautogui.press('space')
+        self.dispatcher.submit('stop', self.input.press, 'space')
         print("Action: Stop")
     
     def confirm_action(self):
         """Confirm action - click or enter"""
-        pyautogui.click()
+        self.dispatcher.submit('confirm', self.input.click)
         print("Action: Confirm")
     
     def play_action(self):
         """Play action - start media or play"""
-        pyautogui.press('space')
+        self.dispatcher.submit('play', self.input.press, 'space')
         print("Action: Play")
     
     def volume_up_action(self):
         """Volume up action"""
-        pyautogui.press('volumeup')
+        self.dispatcher.submit('volume_up', self.input.press, 'volumeup')
         print("Action: Volume Up")
     
     def volume_down_action(self):
         """Volume down action"""
-        pyautogui.press('volumedown')
+        self.dispatcher.submit('volume_down', self.input.press, 'volumedown')
         print("Action: Volume Down")
     
-    def drag_action(self):
-        """Drag action - hold mouse button"""
-        pyautogui.mouseDown()
-        time.sleep(0.1)
-        pyautogui.mouseUp()
-        print("Action: Drag")
+    def combo_action(self, combo):
+        """Combo macro - press the combo's keys in order"""
+        for key in combo['keys']:
+            self.dispatcher.submit(combo['name'], self.input.press, key)
+        print(f"Action: {combo['label']}")
     
     def move_mouse_action(self, hand_pos):
         """Move mouse based on hand position"""
@@ -174,28 +168,28 @@ class WorkingHandGestureController:
             screen_x = int(hand_pos[0] * self.screen_width / 1280)
             screen_y = int(hand_pos[1] * self.screen_height / 720)
             
-            # Apply smoothing
-            if self.last_mouse_pos:
-                screen_x = int(0.7 * screen_x + 0.3 * self.last_mouse_pos[0])
-                screen_y = int(0.7 * screen_y + 0.3 * self.last_mouse_pos[1])
+            # Smooth (and optionally predict ahead) with the configured cursor filter
+            screen_x, screen_y = self.cursor_filter.filter((screen_x, screen_y), self.frame_time)
+            screen_x, screen_y = int(screen_x), int(screen_y)
             
-            pyautogui.moveTo(screen_x, screen_y)
+            # Only the latest pending position is sent to the OS
+            self.dispatcher.submit('move_mouse', self.input.move_to, screen_x, screen_y, coalesce=True)
             self.last_mouse_pos = (screen_x, screen_y)
     
     def process_frame(self, frame):
         """Process a single frame and detect gestures"""
         try:
             # Detect hand using simple method
-            hand_center, area, contour = self.detect_hand_simple(frame)
+            hand_center, area, hand = self.detect_hand_simple(frame)
             
             # Estimate gesture
-            gesture = self.estimate_gesture_simple(hand_center, area, contour)
+            gesture = self.estimate_gesture_simple(hand_center, area, hand)
             
             # Add debug information
             if hand_center:
                 cv2.putText(frame, f"Hand Area: {area:.0f}", (10, 30), 
                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-                cv2.putText(frame, f"Normalized: {area/10000:.2f}", (10, 60), 
+                cv2.putText(frame, f"Fingers: {hand['fingers']}", (10, 60), 
                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
             else:
                 cv2.putText(frame, "No hand detected", (10, 30), 
@@ -215,10 +209,12 @@ class WorkingHandGestureController:
         print("🤖 Working Hand Gesture Controller")
         print("Press 'q' to quit")
         print("\nGesture Guide:")
-        print("- Large hand area: Open Palm (Idle)")
-        print("- Medium hand area: Two Fingers (Play)")
-        print("- Small hand area: Point (Move Mouse)")
-        print("- Very small area: Fist (Stop)")
+        print("- Open Palm (5 fingers): Idle")
+        print("- Fist (0 fingers): Stop/Pause")
+        print("- Two Fingers: Play")
+        print("- Three Fingers: Volume Up")
+        print("- Four Fingers: Volume Down")
+        print("- Point (index finger): Move Mouse")
         print("\n💡 Tips:")
         print("- Ensure good lighting")
         print("- Keep your hand clearly visible")
@@ -229,32 +225,46 @@ class WorkingHandGestureController:
         
         try:
             while True:
-                ret, frame = self.cap.read()
+                ret, frame, frame_time = self.cap.read_latest()
                 if not ret:
                     print("❌ Failed to read frame from camera")
                     break
                 
+                self.frame_time = frame_time
+                
                 frame_count += 1
                 
                 # Process frame
                 frame, gesture, hand_pos = self.process_frame(frame)
                 
                 # Handle gestures
-                if gesture and gesture != self.last_gesture:
-                    self.last_gesture = gesture
+                confirmed = self.gesture_state.update(gesture, self.frame_time)
+                
+                # Confirmed gestures advance the combo automaton; the action of a
+                # gesture that is part of a live combo prefix waits until the
+                # combo completes (dropped) or breaks off (run late)
+                if self.combo_matcher:
+                    combo = None
+                    if self.gesture_state.transitioned and self.gesture_state.current:
+                        combo = self.combo_matcher.feed(self.gesture_state.current, self.frame_time)
+                    for held in self.combo_matcher.release(self.frame_time):
+                        self.action_mappings[held]()
+                    if combo:
+                        self.combo_action(combo)
+                
+                if confirmed:
+                    self.last_gesture = confirmed
                     self.gesture_cooldown = time.time()
                     
-                    print(f"🎯 Detected: {self.gestures.get(gesture, 'Unknown')}")
+                    print(f"🎯 Detected: {self.gestures.get(confirmed, 'Unknown')}")
                     
-                    # Execute action
-                    if gesture in self.action_mappings:
-                        if gesture == 'point':
-                            self.action_mappings[gesture](hand_pos)
-                        else:
-                            self.action_mappings[gesture]()
+                    # Execute action (point moves the mouse below, every frame it is held)
+                    if confirmed in self.action_mappings and confirmed != 'point' and \
+                            not (self.combo_matcher and self.combo_matcher.hold(confirmed, self.frame_time)):
+                        self.action_mappings[confirmed]()
                 
-                # Handle mouse movement for point gesture
-                if gesture == 'point' and hand_pos:
+                # Move the mouse while point is the confirmed gesture
+                if self.gesture_state.current == 'point' and hand_pos:
                     self.move_mouse_action(hand_pos)
                 
                 # Display gesture info on camera frame
@@ -270,6 +280,11 @@ class WorkingHandGestureController:
                 cv2.putText(frame, f"FPS: {fps:.1f}", (10, frame.shape[0] - 20), 
                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
                 
+                # Show capture-to-display latency
+                latency_ms = (time.time() - frame_time) * 1000
+                cv2.putText(frame, f"Latency: {latency_ms:.0f} ms", (10, frame.shape[0] - 50), 
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+                
                 # Display frame
                 cv2.imshow('Working Hand Gesture Controller', frame)
                 
@@ -286,6 +301,12 @@ class WorkingHandGestureController:
     
     def cleanup(self):
         """Clean up resources"""
+        self.dispatcher.stop()
+        stats = self.skin_segmenter.get_stats()
+        print(f"Skin segmentation: {stats['mean_ms']:.2f} ms/frame")
+        stats = self.cap.get_stats()
+        print(f"Frames captured: {stats['captured']}, processed: {stats['delivered']}, "
+              f"dropped: {stats['dropped']}")
         if self.cap.isOpened():
             self.cap.release()
         cv2.destroyAllWindows()